@@ -0,0 +1,124 @@
+"""
+Synthetic inputs for the benchmarks: each generator returns the input graph (same layout as
+the GraphML files in 'examples/inputs') and the recipes available in the server, so they
+can be used with 'ProviderExample'. The root node is always called 'root'.
+"""
+import random
+from typing import Dict, List, Tuple
+
+import networkx as nx
+
+VERSIONS = ["1.0", "2.0", "3.0", "4.0"]
+ROOT = 'root'
+
+
+def _input_graph(edges: List[Tuple[str, str, Dict[str, str]]]) -> Tuple[nx.DiGraph, Dict[str, List[str]]]:
+    g = nx.DiGraph()
+    g.graph['node_default'] = {'library_type': 'static'}
+    g.graph['edge_default'] = {'edge_type': 'topological', 'require_type': 'library',
+                               'visibility': 'public', 'context': 'host'}
+    g.add_node(ROOT)
+    for u, v, data in edges:
+        g.add_edge(u, v, **data)
+    available_recipes = {node: list(VERSIONS) for node in g.nodes}
+    available_recipes[ROOT] = [None]
+    return g, available_recipes
+
+
+def chain(size: int):
+    """ Each node requires the next one """
+    names = [ROOT] + [f'lib{i}' for i in range(1, size)]
+    return _input_graph([(u, v, {'version': '1.0'}) for u, v in zip(names, names[1:])])
+
+
+def fan_out(size: int):
+    """ The root requires all the other nodes """
+    return _input_graph([(ROOT, f'lib{i}', {'version': '1.0'}) for i in range(1, size)])
+
+
+def diamond_lattice(size: int, width: int = 3):
+    """ Levels of nodes, each node requires all the nodes in the next level """
+    levels = [[ROOT]]
+    count = 1
+    while count < size:
+        level = [f'lib{i}' for i in range(count, min(size, count + width))]
+        levels.append(level)
+        count += len(level)
+    edges = [(u, v, {'version': '1.0'}) for upper, lower in zip(levels, levels[1:]) for u in upper for v in lower]
+    return _input_graph(edges)
+
+
+def overrides(size: int):
+    """ A platform package requires (and orders) all the libraries, the root overrides
+        the version of every one of them
+    """
+    libs = [f'lib{i}' for i in range(1, size - 1)]
+    edges = [(ROOT, 'platform', {'version': '1.0'})]
+    edges += [('platform', lib, {'version': '1.0'}) for lib in libs]
+    edges += [(u, v, {'version': '1.0'}) for u, v in zip(libs, libs[1:])]
+    edges += [(ROOT, lib, {'version': '2.0', 'edge_type': 'override'}) for lib in libs]
+    return _input_graph(edges)
+
+
+def subgraphs(size: int):
+    """ Libraries with build-context and private requirements to a few toolchain packages """
+    tools = [('cmake', 'other', 'public'), ('protobuf', 'host', 'private'), ('compiler', 'other', 'public')]
+    n_libs = max(1, (size - 1 - 2 * len(tools)) // 2)
+    edges = []
+    for i in range(n_libs):
+        lib, dep = f'lib{i}', f'dep{i}'
+        edges += [(ROOT, lib, {'version': '1.0'}), (lib, dep, {'version': '1.0'})]
+        for j, (tool, context, visibility) in enumerate(tools):
+            if (i + j) % 2:
+                version = VERSIONS[(i // 2) % 2]
+                edges.append((lib, tool, {'version': version, 'context': context, 'visibility': visibility}))
+    edges += [(tool, f'{tool}-dep', {'version': '1.0'}) for tool, _, _ in tools]
+    return _input_graph(edges)
+
+
+def multi_root(size: int, roots: int):
+    """ Several applications ('app0', 'app1',...) requiring the first level of the same
+        diamond lattice of libraries (to resolve them with 'bfs_multi_builder')
+    """
+    g, available_recipes = diamond_lattice(size)
+    apps = [f'app{i}' for i in range(roots)]
+    for _, lib, data in list(g.out_edges(ROOT, data=True)):
+        for app in apps:
+            g.add_edge(app, lib, **data)
+    g.remove_node(ROOT)
+    del available_recipes[ROOT]
+    available_recipes.update({app: [None] for app in apps})
+    return g, available_recipes, apps
+
+
+def random_graph(size: int, seed: int = 0):
+    """ Each node is required by one or two of the previous ones, with random versions, edge
+        types, visibilities, contexts and options. These graphs can have conflicts, they are
+        not benchmarked (they are used to compare the builders in the tests)
+    """
+    rnd = random.Random(seed)
+    names = [ROOT] + [f'lib{i}' for i in range(1, size)]
+    edges = []
+    for j in range(1, size):
+        for i in rnd.sample(range(j), min(j, rnd.randint(1, 2))):
+            data = {'version': rnd.choice(VERSIONS[:2])}
+            r = rnd.random()
+            if r < 0.25:
+                data['edge_type'] = 'override'
+            elif r < 0.3:
+                data['visibility'] = 'private'
+            elif r < 0.33:
+                data['context'] = 'other'
+            if rnd.random() < 0.2:
+                data['options'] = f"o{rnd.randint(0, 2)}={rnd.randint(0, 1)}"
+            edges.append((names[i], names[j], data))
+    return _input_graph(edges)
+
+
+GENERATORS = {
+    'chain': chain,
+    'fan_out': fan_out,
+    'diamond_lattice': diamond_lattice,
+    'overrides': overrides,
+    'subgraphs': subgraphs,
+}
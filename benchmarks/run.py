@@ -0,0 +1,240 @@
+import gc
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import networkx as nx
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder, bfs_multi_builder, BFSBuilderEx1, BatchedBFSBuilder
+from conans.graph.cache import GraphCache
+from conans.graph.versions import Version, VersionRange, VersionIndex
+from examples.utils import ProviderExample, CountingProvider
+from .generators import GENERATORS, ROOT, multi_root
+
+DEFAULT_SIZES = [10, 100, 1000, 10000]
+DEFAULT_VERSIONS = [1000, 10000]
+DEFAULT_ROOTS = [1, 10]
+MULTI_ROOT_SIZE = 1000
+
+
+def _timeit(func):
+    start = time.perf_counter()
+    ret = func()
+    return ret, time.perf_counter() - start
+
+
+def run_case(shape: str, size: int, memory: bool = True):
+    input_graph, available_recipes = GENERATORS[shape](size)
+    provider = CountingProvider(input_graph, available_recipes)
+
+    gc.collect()
+    graph, bfs_builder_time = _timeit(lambda: bfs_builder(ROOT, provider, builder_class=BFSBuilderEx1))
+    provider_calls = provider.calls
+    # 'bfs_builder' already calls 'finish_graph', we time it again (it is idempotent)
+    _, finish_graph_time = _timeit(graph.finish_graph)
+    printable, printable_graph_time = _timeit(lambda: Graph.printable_graph(graph))
+
+    # Same resolution requesting the conanfiles level by level
+    batched_provider = CountingProvider(input_graph, available_recipes)
+    gc.collect()
+    _, batched_time = _timeit(lambda: bfs_builder(ROOT, batched_provider, builder_class=BatchedBFSBuilder))
+
+    # Storing the graph in the cache and loading it again, instead of resolving it
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = GraphCache(tmp)
+        key = GraphCache.key(shape, str(size))
+        _, cache_save_time = _timeit(lambda: cache.save(key, graph))
+        compact, cache_load_time = _timeit(lambda: cache.load(key))
+        _, to_networkx_time = _timeit(compact.to_networkx)
+        cache_size = os.path.getsize(os.path.join(tmp, f"{key}.graph"))
+
+    result = {
+        'shape': shape,
+        'size': size,
+        'nodes': graph.number_of_nodes(),
+        'edges': graph.number_of_edges(),
+        'printable_nodes': printable.number_of_nodes(),
+        'provider_calls': provider_calls,
+        'provider_round_trips': provider.round_trips,
+        'batched_round_trips': batched_provider.round_trips,
+        'bfs_builder_s': bfs_builder_time,
+        'finish_graph_s': finish_graph_time,
+        'printable_graph_s': printable_graph_time,
+        'batched_bfs_builder_s': batched_time,
+        'cache_save_s': cache_save_time,
+        'cache_load_s': cache_load_time,
+        'to_networkx_s': to_networkx_time,
+        'cache_size_kb': cache_size // 1024,
+    }
+
+    if memory:
+        # Tracing memory allocations slows down the execution, use a different run
+        del graph, printable, compact
+        gc.collect()
+        tracemalloc.start()
+        bfs_builder(ROOT, ProviderExample(input_graph, available_recipes), builder_class=BFSBuilderEx1)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result['peak_memory_kb'] = peak // 1024
+    return result
+
+
+def run_versions(count: int, queries: int = 1000):
+    """ Best match for version ranges in a package with 'count' versions published: using the
+        sorted index or scanning (and parsing) all of them
+    """
+    versions = [f"{major}.{minor}.{patch}" for major in range(count // 100 + 1)
+                for minor in range(10) for patch in range(10)][:count]
+    expressions = [f"[>={i % (count // 100 + 1)}.{i % 10} <{i % (count // 100 + 1) + 1}.0]" for i in range(queries)]
+
+    index, index_time = _timeit(lambda: VersionIndex(versions))
+    indexed, indexed_time = _timeit(lambda: [index.best_match(it) for it in expressions])
+
+    def linear_scan(expression):
+        version_range = VersionRange.parse(expression)
+        return max((it for it in versions if Version(it) in version_range), key=Version, default=None)
+    scanned, scanned_time = _timeit(lambda: [linear_scan(it) for it in expressions[:max(1, queries // 10)]])
+    assert scanned == indexed[:len(scanned)]
+
+    return {
+        'versions': count,
+        'queries': queries,
+        'index_build_s': index_time,
+        'indexed_query_us': 1e6 * indexed_time / len(indexed),
+        'linear_query_us': 1e6 * scanned_time / len(scanned),
+    }
+
+
+def run_multi_root(roots: int, size: int = MULTI_ROOT_SIZE):
+    """ Several roots requiring the same graph of 'size' libraries: 'bfs_multi_builder' (sharing
+        the provider results) versus resolving each root on its own
+    """
+    input_graph, available_recipes, apps = multi_root(size, roots)
+    provider = CountingProvider(input_graph, available_recipes)
+    gc.collect()
+    _, multi_time = _timeit(lambda: bfs_multi_builder(apps, provider, builder_class=BFSBuilderEx1))
+
+    separate_calls = 0
+
+    def separate():
+        nonlocal separate_calls
+        for app in apps:
+            separate_provider = CountingProvider(input_graph, available_recipes)
+            bfs_builder(app, separate_provider, builder_class=BFSBuilderEx1)
+            separate_calls += separate_provider.calls
+    gc.collect()
+    _, separate_time = _timeit(separate)
+
+    return {
+        'roots': roots,
+        'size': size,
+        'multi_builder_s': multi_time,
+        'multi_provider_calls': provider.calls,
+        'separate_builder_s': separate_time,
+        'separate_provider_calls': separate_calls,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=os.path.dirname(__file__),
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline):
+    """ Ratio (current / baseline) for every measure of the cases in both reports """
+    baseline_results = {(it['shape'], it['size']): it for it in baseline['results']}
+    measures = ['bfs_builder_s', 'batched_bfs_builder_s', 'finish_graph_s', 'printable_graph_s', 'cache_load_s',
+                'provider_calls', 'batched_round_trips', 'peak_memory_kb']
+    sys.stdout.write(f"{'shape':<16}{'size':>7}" + "".join(f"{it:>20}" for it in measures) + "\n")
+    for it in report['results']:
+        other = baseline_results.get((it['shape'], it['size']))
+        if not other:
+            continue
+        line = f"{it['shape']:<16}{it['size']:>7}"
+        for measure in measures:
+            if it.get(measure) is None or not other.get(measure):
+                line += f"{'-':>20}"
+            else:
+                line += f"{it[measure] / other[measure]:>20.2f}"
+        sys.stdout.write(line + "\n")
+
+
+def main(shapes, sizes, output, memory=True, baseline=None, versions=(), roots=()):
+    report = {
+        'revision': _git_revision(),
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'networkx': nx.__version__,
+        'results': [],
+        'versions': [],
+        'multi_root': [],
+    }
+    for shape in shapes:
+        for size in sizes:
+            sys.stdout.write(f"Running '{shape}' with {size} nodes... ")
+            sys.stdout.flush()
+            result = run_case(shape, size, memory=memory)
+            sys.stdout.write(f"{result['bfs_builder_s']:.3f}s (load from cache: {result['cache_load_s']:.3f}s)\n")
+            report['results'].append(result)
+    for count in versions:
+        result = run_versions(count)
+        sys.stdout.write(f"Version ranges with {count} versions: {result['indexed_query_us']:.1f}us per query "
+                         f"(linear scan: {result['linear_query_us']:.1f}us)\n")
+        report['versions'].append(result)
+    for count in roots:
+        result = run_multi_root(count)
+        sys.stdout.write(f"{count} root(s) with {result['size']} nodes: {result['multi_builder_s']:.3f}s "
+                         f"(each one on its own: {result['separate_builder_s']:.3f}s)\n")
+        report['multi_root'].append(result)
+
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    sys.stdout.write(f"Report written to '{output}'\n")
+
+    if baseline:
+        with open(baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    import argparse
+    import logging
+
+    formatter_class = argparse.RawDescriptionHelpFormatter
+    parser = argparse.ArgumentParser(description="Conans Graph: benchmarks",
+                                     formatter_class=formatter_class)
+    parser.add_argument("--shape", dest="shapes", action="append", choices=sorted(GENERATORS.keys()),
+                        help="shape of the graph to run (all of them by default).")
+    parser.add_argument("--size", dest="sizes", action="append", type=int,
+                        help=f"number of nodes of the graphs (default: {DEFAULT_SIZES}).")
+    parser.add_argument("--versions", dest="versions", action="append", type=int,
+                        help=f"number of versions published for the version ranges benchmark "
+                             f"(default: {DEFAULT_VERSIONS}).")
+    parser.add_argument("--roots", dest="roots", action="append", type=int,
+                        help=f"number of roots for the 'bfs_multi_builder' benchmark, each one requires "
+                             f"the same {MULTI_ROOT_SIZE} libraries (default: {DEFAULT_ROOTS}).")
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="do not measure the peak memory (it requires an extra run).")
+    parser.add_argument("--compare", dest="baseline", default=None,
+                        help="report to compare the results with.")
+    parser.add_argument("-o", "--output", dest="output", default="bench_report.json",
+                        help="file to write the report to.")
+    arguments = parser.parse_args(sys.argv[1:])
+
+    logging.basicConfig(stream=sys.stderr, level=logging.WARNING,
+                        format='%(name)s (%(levelname)s): %(message)s')
+    logging.getLogger('conans').setLevel(logging.ERROR)
+
+    main(arguments.shapes or sorted(GENERATORS.keys()), arguments.sizes or DEFAULT_SIZES,
+         arguments.output, memory=arguments.memory, baseline=arguments.baseline,
+         versions=arguments.versions or DEFAULT_VERSIONS, roots=arguments.roots or DEFAULT_ROOTS)
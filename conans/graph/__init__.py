@@ -1 +1,2 @@
 from .graph import Graph
+from .compact import CompactGraph
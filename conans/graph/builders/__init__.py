@@ -1,16 +1,81 @@
-from typing import Type
+import asyncio
+import functools
+from concurrent.futures import Executor
+from typing import Type, Dict, Hashable, Optional, List, Iterable, Tuple
 
 from .base import BaseBuilder
+from .bfs_async import AsyncBFSBuilder
+from .bfs_batched import BatchedBFSBuilder
 from .bfs_ex1 import BFSBuilderEx1
+from .instrumentation import Observer, Statistics, instrument
 from ..graph import Graph
-from ..proxy_types import Provider
+from ..providers import SyncProvider, CachingProvider
+from ..proxy_types import Provider, AsyncProvider
 
 
 def bfs_builder(vertex: str, provider: Type[Provider],
-                builder_class: Type[BaseBuilder] = BFSBuilderEx1, **node_args):
+                builder_class: Type[BaseBuilder] = BFSBuilderEx1,
+                subgraphs: Optional[Dict[Hashable, Graph]] = None, executor: Optional[Executor] = None,
+                observers: Optional[List[Observer]] = None, **node_args):
+    """ Builds the graph starting from 'vertex'. If an 'executor' is given, the subgraphs
+        (private and build-context requirements) are built concurrently using it, with a
+        process pool the provider and the graphs need to be picklable (and the events inside
+        the worker processes are not reported to the 'observers').
+    """
     g = Graph()
     g.add_node(vertex, enabled=True, **node_args)
-    builder = builder_class(g, provider)
-    builder.run(vertex)
+    builder = builder_class(g, provider, subgraphs=subgraphs, executor=executor, observers=observers)
+    with instrument(builder, observers):
+        builder.run(vertex)
     g.finish_graph()
     return g
+
+
+def bfs_multi_builder(roots: Iterable[str], provider: Type[Provider],
+                      builder_class: Type[BaseBuilder] = BFSBuilderEx1,
+                      subgraphs: Optional[Dict[Hashable, Graph]] = None, executor: Optional[Executor] = None,
+                      observers: Optional[List[Observer]] = None) -> Dict[str, Graph]:
+    """ Builds the graph for each one of the roots sharing the work between them: the conanfiles
+        returned by the provider (if it is pure, the same constraints are resolved only once)
+        and the subgraphs (private and build-context requirements) with the same requirement.
+        The host graph of every root is still traversed (and pruned, finished) on its own, so
+        the time grows with roots x size of the graph even if they share most of it: it saves
+        the provider calls only (see the 'multi_root' benchmark, 10 roots requiring the same
+        1000 libraries take ~60% of the time of resolving them one by one).
+    """
+    if provider.pure and not isinstance(provider, CachingProvider):
+        provider = CachingProvider(provider, maxsize=None)
+    subgraphs = subgraphs if subgraphs is not None else {}
+    return {root: bfs_builder(root, provider, builder_class=builder_class, subgraphs=subgraphs,
+                              executor=executor, observers=observers)
+            for root in roots}
+
+
+def bfs_update(graph: Graph, provider: Type[Provider], changed_packages: Iterable[str] = (),
+               changed_requires: Iterable[Tuple[str, str]] = (),
+               builder_class: Type[BaseBuilder] = BFSBuilderEx1,
+               subgraphs: Optional[Dict[Hashable, Graph]] = None, executor: Optional[Executor] = None,
+               observers: Optional[List[Observer]] = None) -> Graph:
+    """ Updates (in place) a graph built by 'bfs_builder' after some changes in the provider,
+        only the vertices affected by them are resolved again (see 'BFSBuilderEx1.update').
+        Any cache in the provider needs to be invalidated by the caller. The root of the
+        graph, if changed, is resolved again by the provider.
+    """
+    builder = builder_class(graph, provider, subgraphs=subgraphs, executor=executor, observers=observers)
+    with instrument(builder, observers):
+        region = builder.update(changed_packages, changed_requires)
+    graph.finish_graph(region)
+    return graph
+
+
+async def async_bfs_builder(vertex: str, provider: AsyncProvider,
+                            builder_class: Type[BaseBuilder] = AsyncBFSBuilder, max_concurrency: int = 8,
+                            **node_args):
+    """ Builds the graph using an async provider: the builder runs in a worker thread while the
+        requests to the provider (at most 'max_concurrency' at the same time) are awaited in
+        the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    sync_provider = SyncProvider(provider, loop, max_concurrency=max_concurrency)
+    build = functools.partial(bfs_builder, vertex, sync_provider, builder_class=builder_class, **node_args)
+    return await loop.run_in_executor(None, build)
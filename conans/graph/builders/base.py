@@ -1,13 +1,24 @@
-from typing import Type
+from concurrent.futures import Executor
+from typing import Type, Dict, Hashable, Optional, List
 
+from .instrumentation import Observer
 from ..graph import Graph
 from ..proxy_types import Provider
 
 
 class BaseBuilder:
-    def __init__(self, graph: Graph, provider: Type[Provider]):
+    def __init__(self, graph: Graph, provider: Type[Provider],
+                 subgraphs: Optional[Dict[Hashable, Graph]] = None, executor: Optional[Executor] = None,
+                 observers: Optional[List[Observer]] = None):
         self.provider = provider
         self.graph = graph
+        # Subgraphs already built (private and build-context requirements), shared by all the
+        #  builders working on the same graph so equivalent ones are built only once
+        self.subgraphs = subgraphs if subgraphs is not None else {}
+        # Independent subgraphs can be built concurrently using this executor
+        self.executor = executor
+        # Observers for the events of this builder (and the ones for the subgraphs)
+        self.observers = observers or []
 
     def run(self, start_vertex: str):
         raise NotImplementedError
@@ -1,13 +1,56 @@
+import itertools
 import logging
-from typing import List
-
-import networkx as nx
+from collections import deque
+from typing import Dict, Iterable, Iterator
 
 from .base import BaseBuilder
 
 log = logging.getLogger(__name__)
 
 
+class WorkQueue:
+    """ FIFO queue of vertices with constant time membership check. Vertices can be removed
+        from any position, they are kept in the underlying deque and discarded lazily when
+        they reach the front of it.
+    """
+
+    def __init__(self):
+        self._items = deque()
+        self._index: Dict[str, int] = {}  # Vertex -> token of its valid entry in the deque
+        self._tokens = itertools.count()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, vertex: str) -> bool:
+        return vertex in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        for vertex, token in self._items:
+            if self._index.get(vertex) == token:
+                yield vertex
+
+    def clear(self):
+        self._items.clear()
+        self._index.clear()
+
+    def append(self, vertex: str) -> None:
+        token = next(self._tokens)
+        self._index[vertex] = token
+        self._items.append((vertex, token))
+
+    def popleft(self) -> str:
+        while True:
+            vertex, token = self._items.popleft()
+            if self._index.get(vertex) == token:
+                del self._index[vertex]
+                return vertex
+
+    def discard(self, vertices: Iterable[str]) -> None:
+        for vertex in vertices:
+            self._index.pop(vertex, None)
+
+
 class BFSBuilder(BaseBuilder):
     """ Not exactly a visitor, as we are building the graph at the same time we are
         visiting it (and there is logic between the two layers), this is the reason why
@@ -17,50 +60,53 @@ class BFSBuilder(BaseBuilder):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._queue: List[str] = []
+        self._queue = WorkQueue()
+        self._color: Dict[str, str] = {}  # Vertices not in this dict are 'white'
 
     def _append(self, vertex: str) -> None:
         self._queue.append(vertex)
         self.discover_vertex(vertex)
-        self.graph.nodes[vertex]['color'] = 'gray'
+        self._color[vertex] = 'gray'
 
     def run(self, start_vertex: str):
         # 1. Initialize all vertices
         self._queue.clear()
-        nx.set_node_attributes(self.graph, 'color', 'white')
+        self._color.clear()
 
         # 2. Append initial vertex
         self._append(start_vertex)
+        self._process_queue()
 
+    def _process_queue(self):
         # Iterate the queue
         while self._queue:
-            vertex = self._queue.pop(0)
+            vertex = self._queue.popleft()
             self.examine_vertex(vertex)
-            for _, target in self.graph.out_edges(vertex):
+            for _, target in list(self.graph.out_edges(vertex)):  # Visitor can modify the graph
                 self.examine_edge(vertex, target)
-                if self.graph.nodes[target]['color'] == 'white':
+                if self._color.get(target, 'white') == 'white':
                     self.tree_edge(vertex, target)
                     self._append(target)
                 else:
                     self.non_tree_edge(vertex, target)
-            self.graph.nodes[vertex]['color'] = 'black'
+            self._color[vertex] = 'black'
             self.finish_vertex(vertex)
         # Queue exhausted
 
     def discover_vertex(self, vertex: str):
-        log.debug(f"BFSBuilder::discover_vertex(vertex='{vertex}')")
+        log.debug("BFSBuilder::discover_vertex(vertex='%s')", vertex)
 
     def examine_vertex(self, vertex: str):
-        log.debug(f"BFSBuilder::examine_vertex(vertex='{vertex}')")
+        log.debug("BFSBuilder::examine_vertex(vertex='%s')", vertex)
 
     def finish_vertex(self, vertex: str):
-        log.debug(f"BFSBuilder::finish_vertex(vertex='{vertex}')")
+        log.debug("BFSBuilder::finish_vertex(vertex='%s')", vertex)
 
     def examine_edge(self, origin: str, target: str):
-        log.debug(f"BFSBuilder::examine_edge(origin='{origin}', requires='{target}')")
+        log.debug("BFSBuilder::examine_edge(origin='%s', requires='%s')", origin, target)
 
     def tree_edge(self, origin: str, target: str):
-        log.debug(f"BFSBuilder::tree_edge(origin='{origin}', requires='{target}')")
+        log.debug("BFSBuilder::tree_edge(origin='%s', requires='%s')", origin, target)
 
     def non_tree_edge(self, origin: str, target: str):
-        log.debug(f"BFSBuilder::non_tree_edge(origin='{origin}', requires='{target}')")
+        log.debug("BFSBuilder::non_tree_edge(origin='%s', requires='%s')", origin, target)
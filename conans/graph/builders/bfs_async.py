@@ -0,0 +1,38 @@
+import logging
+from typing import Iterable, Set
+
+from .bfs_ex1 import BFSBuilderEx1
+
+log = logging.getLogger(__name__)
+
+
+class AsyncBFSBuilder(BFSBuilderEx1):
+    """ Same logic (and results) as BFSBuilderEx1, but before examining a vertex whose conanfile
+        hasn't been requested yet, it prefetches the conanfiles for all the vertices in the queue
+        (the current frontier). Conanfiles are fetched concurrently if the provider supports it
+        (like 'SyncProvider', see 'async_bfs_builder').
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefetched: Set[str] = set()
+
+    def run(self, start_vertex: str):
+        self._prefetched.clear()
+        super().run(start_vertex)
+
+    def examine_vertex(self, vertex: str):
+        if hasattr(self.provider, 'prefetch') and vertex not in self._prefetched \
+                and 'conanfile' not in self.graph.nodes[vertex]:
+            self._prefetched = {vertex, *self._queue}
+            self._prefetch(self._prefetched)
+        super().examine_vertex(vertex)
+
+    def _prefetch(self, vertices: Iterable[str]):
+        requests = []
+        for vertex in vertices:
+            if 'conanfile' not in self.graph.nodes[vertex]:
+                for _, constraints in self._resolution_orders(vertex) or []:
+                    requests.append((vertex, constraints))
+        log.debug("AsyncBFSBuilder::_prefetch(requests (%s))", len(requests))
+        self.provider.prefetch(requests)
@@ -1,112 +1,385 @@
 import logging
-from typing import List, Tuple, Dict, Optional
-
-import networkx as nx
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import List, Tuple, Dict, Optional, Set, Hashable, Type, Union, Iterable
 
 from .bfs import BFSBuilder
-from ..proxy_types import Require, ConanFile, Visibility, Context
+from .instrumentation import Observer, ObservedProvider
+from ..graph import Graph
+from ..proxy_types import Require, ConanFile, Visibility, Context, EdgeType, Provider
 
 log = logging.getLogger(__name__)
 
 
+def _build_subgraph(vertex: str, require: Require, provider: Provider, builder_class: Type[BFSBuilder],
+                    subgraphs: Dict[Hashable, Graph], observers: Optional[List[Observer]]) -> Graph:
+    log.info("=== New subgraph starting from '%s' to '%s'", vertex, require.name)
+    conanfile = provider.get_conanfile(require.name, [(vertex, require), ])
+    from . import bfs_builder
+    g = bfs_builder(require.name, provider=provider, builder_class=builder_class, subgraphs=subgraphs,
+                    observers=observers, conanfile=conanfile)
+    log.info("=== End subgraph")
+    return g
+
+
 class BFSBuilderEx1(BFSBuilder):
+    # Prune the branch of an already evaluated node only if a new requirement to it would modify
+    #  the resolution of any of the nodes in that branch (instead of always)
+    minimal_prune: bool = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Subgraphs being built by the executor, they are added to the graph as futures
+        self._pending_subgraphs: Dict[Hashable, Future] = {}
+        self._examined: Set[str] = set()
+
+    def run(self, start_vertex: str):
+        self._examined.clear()
+        super().run(start_vertex)
+        self._join_subgraphs()
+
+    def _join_subgraphs(self):
+        # Wait for the subgraphs being built concurrently
+        for key, future in self._pending_subgraphs.items():
+            self.subgraphs.setdefault(key, future.result())
+        self._pending_subgraphs.clear()
+        self.graph.join_subgraphs()
+
+    def update(self, changed_packages: Iterable[str] = (),
+               changed_requires: Iterable[Tuple[str, str]] = ()) -> Set[str]:
+        """ Resolves again a finished graph after some changes in the provider: packages whose
+            conanfile can be a different one now (new versions available,...) and requirements
+            'origin' -> 'target' that are different (added, removed or modified in the recipe of
+            'origin'). Only these vertices and the branches below them are pruned and resolved
+            again, subgraphs containing any of them are built again. Returns the vertices that
+            need to be finished again (see 'Graph.finish_graph').
+        """
+        changed = set(changed_packages) | {origin for origin, _ in changed_requires}
+        self._queue.clear()
+        self._color = dict.fromkeys(self.graph.nodes, 'black')
+        self._examined.clear()
+
+        # Subgraphs not affected by the changes can be reused
+        outdated = {}
+        for vertex, subgraphs in self.graph.get_subgraphs().items():
+            for g, require in subgraphs:
+                key = self._subgraph_key(vertex, require)
+                if key not in outdated:
+                    outdated[key] = require.name in changed or self._contains(g, changed)
+                if outdated[key]:
+                    self.subgraphs.pop(key, None)
+                else:
+                    self.subgraphs.setdefault(key, g)
+
+        requires_graph = self.graph.get_requires_graph()
+        dirty = [it for it in changed if it in self.graph]
+        dirty.sort(key=lambda it: (it in requires_graph, it in requires_graph and self.graph.requires_position(it)))
+        for vertex in dirty:
+            if vertex in self._queue or vertex not in self.graph:
+                continue  # Already pruned by a previous one
+            branch_nodes = self._collect_branch_nodes(vertex, raise_if_pruning=vertex)
+            pending = self._remove_branch_nodes(vertex, branch_nodes)
+            self.graph.nodes[vertex].pop('conanfile', None)
+            self._append(vertex)
+            for it in pending:
+                self._append(it)
+
+        # Vertices that are not resolved again, but with outdated subgraphs
+        for vertex, subgraphs in list(self.graph.get_subgraphs().items()):
+            if any(outdated[self._subgraph_key(vertex, require)] for _, require in subgraphs):
+                self.graph.remove_subgraphs(vertex)
+                for _, require in subgraphs:
+                    self.graph.add_subgraph(vertex, self._get_subgraph(vertex, require), require)
+
+        self._process_queue()
+        self._join_subgraphs()
+
+        # Everything below the examined vertices can have changed (new paths, overrides,...)
+        region = {it for it in self._examined if it in self.graph}  # Some of them can be pruned later
+        stack = list(region)
+        while stack:
+            for _, target in self.graph.out_edges(stack.pop()):
+                if target not in region:
+                    region.add(target)
+                    stack.append(target)
+        return region
+
+    @staticmethod
+    def _contains(graph: Graph, names: Set[str]) -> bool:
+        """ Whether the graph, or any of its subgraphs, contains any of these vertices """
+        graphs = [graph]
+        visited = {id(graph)}
+        while graphs:
+            g = graphs.pop()
+            if any(it in g for it in names):
+                return True
+            for subgraphs in g.get_subgraphs().values():
+                for sg, require in subgraphs:
+                    if id(sg) not in visited:
+                        visited.add(id(sg))
+                        graphs.append(sg)
+        return False
 
     def examine_vertex(self, vertex: str):
-        log.debug(f"BFSBuilder::examine_vertex(conanfile='{vertex}')")
+        log.debug("BFSBuilder::examine_vertex(conanfile='%s')", vertex)
+        self._examined.add(vertex)
         # We are going to populate the graph based on the Conan information, so
         # the algorithm can keep running
         if 'conanfile' not in self.graph.nodes[vertex]:
             conanfile = self._get_conanfile(vertex)
             if not conanfile:
-                log.warning(f"No conanfile found for '{vertex}'")
+                log.warning("No conanfile found for '%s'", vertex)
                 return
             self.graph.nodes[vertex]['conanfile'] = conanfile
 
         for require in self.graph.nodes[vertex]['conanfile'].get_requires():
-            node_already_in_graph = self.graph.has_node(require.name)
-            color = self.graph.nodes[require.name]['color'] if node_already_in_graph else 'white'
             if require.visibility == Visibility.private or require.context == Context.other:
-                # We need to create a new graph
-                # TODO: This should be a call to bfs_builder
-                log.info(f"=== New subgraph starting from '{vertex}' to '{require.name}'")
-                conanfile = self.provider.get_conanfile(require.name, [(vertex, require), ])
-                from . import bfs_builder
-                g = bfs_builder(require.name, provider=self.provider, builder_class=self.__class__, conanfile=conanfile)
-                self.graph.add_subgraph(vertex, g, require)
-                log.info(f"=== End subgraph")
+                # We need to create a new graph (or reuse an equivalent one)
+                self.graph.add_subgraph(vertex, self._get_subgraph(vertex, require), require)
                 continue
             else:
                 # It belongs to the 'host' context and it is not private
-                self.graph.add_node(require.name, color=color)
+                self.graph.add_node(require.name)
             self.graph.add_edge(vertex, require.name, require=require)
 
+    def _get_subgraph(self, vertex: str, require: Require) -> Union[Graph, Future]:
+        key = self._subgraph_key(vertex, require)
+        g = self.subgraphs.get(key)
+        if g is None:
+            g = self._pending_subgraphs.get(key)
+        if g is None:
+            if self.executor is not None:
+                # Nested subgraphs are built serially inside the worker (waiting in a worker
+                #  for other tasks of the same pool could exhaust it)
+                if isinstance(self.executor, ProcessPoolExecutor):
+                    # Arguments are pickled in a different thread (it needs a copy of the registry)
+                    #  and the events in the worker processes cannot be observed (the observers
+                    #  are not sent, neither the provider that reports to them)
+                    provider = self.provider
+                    if isinstance(provider, ObservedProvider):
+                        provider = provider.provider
+                    g = self.executor.submit(_build_subgraph, vertex, require, provider, self.__class__,
+                                             dict(self.subgraphs), None)
+                else:
+                    g = self.executor.submit(_build_subgraph, vertex, require, self.provider, self.__class__,
+                                             self.subgraphs, self.observers)
+                self._pending_subgraphs[key] = g
+            else:
+                g = _build_subgraph(vertex, require, self.provider, self.__class__, self.subgraphs, self.observers)
+                self.subgraphs[key] = g
+        else:
+            log.debug("Reuse subgraph from '%s' to '%s'", vertex, require.name)
+        return g
+
+    def _subgraph_key(self, vertex: str, require: Require) -> Hashable:
+        # The subgraph depends only on the requirement (unless the provider takes into account
+        #  the origin of the constraints)
+        key = (require.name, require.constraint_key(), require.context)
+        if not self.provider.pure:
+            key += (vertex, )
+        return key
+
     def non_tree_edge(self, origin: str, target: str):
-        log.debug(f"BFSBuilder::non_tree_edge(origin='{origin}', requires='{target}')")
+        log.debug("BFSBuilder::non_tree_edge(origin='%s', requires='%s')", origin, target)
         # A new requirement just discovered, to a node that has already been evaluated, we will
         #  prune that branch of the graph just in case this new requirement would have resulted
         #  in a different conanfile.
         if target not in self._queue:
-            self._prune(target,
-                        raise_if_pruning=origin)  # TODO: Optimization, check if the new require is going to modify anything (keep this minimal, implement in a child)
+            branch_nodes = self._collect_branch_nodes(target, raise_if_pruning=origin)
+            if self.minimal_prune:
+                try:
+                    conanfile = self._get_conanfile(target)
+                except AssertionError:
+                    # The graph is not complete yet (an ambiguity now can be solved by requirements
+                    #  not discovered yet), it is resolved again when the target is examined
+                    conanfile = None
+                if not self._modifies_branch(origin, target, branch_nodes, conanfile):
+                    log.debug("Requirement '%s' -> '%s' doesn't modify the branch", origin, target)
+                    return
+            pending = self._remove_branch_nodes(target, branch_nodes)
+            # The conanfile is resolved again when the target is examined: more requirements to
+            #  it can be discovered while it is in the queue (and they don't prune it again)
+            self.graph.nodes[target].pop('conanfile', None)
             self._append(target)
+            for it in pending:
+                self._append(it)
 
-    def _prune(self, vertex: str, raise_if_pruning: str):
-        log.debug(f"BFSBuilder::_prune(vertex='{vertex}', raise_if_pruning='{raise_if_pruning}')")
+    def _prune(self, vertex: str, raise_if_pruning: str) -> List[str]:
+        """ Returns the nodes in the branch that are still required from outside of it, these
+            nodes (and the requirements) are kept in the graph and need to be evaluated again.
+        """
+        log.debug("BFSBuilder::_prune(vertex='%s', raise_if_pruning='%s')", vertex, raise_if_pruning)
 
         # We've discovered this vertex from another branch in the graph, it can potentially
         #   be resolved to a different version and have a different set of requirements/overrides,
         #   options,... we need to build again all this branch
+        branch_nodes = self._collect_branch_nodes(vertex, raise_if_pruning)
+        return self._remove_branch_nodes(vertex, branch_nodes)
 
-        def collect_branch_nodes(node):
+    def _collect_branch_nodes(self, vertex: str, raise_if_pruning: str) -> Set[str]:
+        """ All the nodes reachable from 'vertex' (iterative traversal, each node is visited only
+            once). It raises if 'raise_if_pruning' belongs to the branch as it means a cycle.
+        """
+        branch_nodes: Set[str] = set()
+        stack = [vertex]
+        while stack:
+            node = stack.pop()
             for _, target in self.graph.out_edges(node):
-                for it in collect_branch_nodes(target):
-                    yield it
-                yield target
+                if target == raise_if_pruning:
+                    raise Exception(f"There is cycle involving '{vertex}' and '{raise_if_pruning}'")
+                if target not in branch_nodes:
+                    branch_nodes.add(target)
+                    stack.append(target)
+        return branch_nodes
 
-        branch_nodes = set(list(collect_branch_nodes(vertex)))
-
-        if raise_if_pruning in branch_nodes:
-            raise Exception(f"There is cycle involving '{vertex}' and '{raise_if_pruning}'")
+    def _remove_branch_nodes(self, vertex: str, branch_nodes: Set[str]) -> List[str]:
+        # Requirements declared by nodes outside the branch won't be declared again
+        kept_edges = [(u, v, data) for v in branch_nodes for u, _, data in self.graph.in_edges(v, data=True)
+                      if u not in branch_nodes and u != vertex]
 
         # Remove these nodes from the queue and from the graph
-        self._queue = [it for it in self._queue if it not in branch_nodes]
+        self._queue.discard(branch_nodes)
+        for node in branch_nodes:
+            self._color.pop(node, None)
         self.graph.remove_nodes_from(branch_nodes)
+        self.graph.remove_subgraphs(vertex)  # It will be expanded again
+
+        self.graph.add_edges_from(kept_edges)
+        return list(dict.fromkeys(v for _, v, _ in kept_edges))
+
+    def _modifies_branch(self, origin: str, target: str, branch_nodes: Set[str],
+                         conanfile: Optional[ConanFile]) -> bool:
+        """ Whether the requirement 'origin' -> 'target' can modify the resolution of 'target'
+            or any node in its branch: it happens if the conanfile for 'target' (the one given
+            is resolved taking into account the new requirement) is a different one or if any
+            new ancestor of the branch has requirements (overrides) to it.
+        """
+        previous_conanfile = self.graph.nodes[target].get('conanfile')
+        if previous_conanfile is None or conanfile != previous_conanfile:
+            return True
+
+        if self.graph.edges[origin, target]['require'].edge_type != EdgeType.topological:
+            return False  # Ancestors are the same ones
+
+        # Ancestors of the target before this requirement (there are no cycles, so they cannot
+        #  depend on the edge 'origin' -> 'target')
+        requires_graph = self.graph.get_requires_graph()
+        previous_ancestors: Set[str] = {it for it in requires_graph.predecessors(target) if it != origin}
+        stack = list(previous_ancestors)
+        while stack:
+            for it in requires_graph.predecessors(stack.pop()):
+                if it not in previous_ancestors:
+                    previous_ancestors.add(it)
+                    stack.append(it)
+
+        # The ancestors of a previous ancestor are previous ones too, no need to go above them
+        new_ancestors: Set[str] = set()
+        stack = [origin]
+        while stack:
+            node = stack.pop()
+            if node not in new_ancestors and node not in previous_ancestors:
+                new_ancestors.add(node)
+                stack.extend(requires_graph.predecessors(node))
+        for it in new_ancestors:
+            for _, node in self.graph.out_edges(it):
+                if (node in branch_nodes or node == target) and (it, node) != (origin, target):
+                    return True
+        return False
 
     def _get_conanfile(self, vertex: str) -> Optional[ConanFile]:
         """ Resolve precedence between requires, those closer to root take precedence
             (steps according to 'requires' relation)
         """
-        in_edges = self.graph.in_edges(vertex, data='require')
+        resolution_orders = self._resolution_orders(vertex)
+        if resolution_orders is None:
+            log.debug("Vertex '%s' doesn't belong to the requires graph", vertex)
+            return
         # Handle corner-case for the rootnode  # TODO: You can do better
+        if not self.graph.in_degree(vertex):
+            log.warning("Handle root corner case. It is vertex '%s'", vertex)
+
+        (_, constraints), alternatives = resolution_orders[0], resolution_orders[1:]
+        conanfile = self._request_conanfile(vertex, constraints)
+        for (ori, other), constraints in alternatives:
+            candidate = self._request_conanfile(vertex, constraints)
+            assert candidate == conanfile, f"Multiple conanfiles --> ambiguity! Requirers '{ori}' and" \
+                                           f" '{other}' of '{vertex}' are unordered and resolve to" \
+                                           f" '{conanfile}' and '{candidate}'"
+        return conanfile
+
+    def _request_conanfile(self, vertex: str, constraints: List[Tuple[str, Require]]) -> ConanFile:
+        return self.provider.get_conanfile(vertex, constraints)
+
+    def _resolution_orders(self, vertex: str) -> Optional[List[Tuple[Optional[Tuple[str, str]],
+                                                                      List[Tuple[str, Require]]]]]:
+        """ Constraints (in order) to request the conanfile for the vertex to the provider. The
+            first item is the one used to resolve it, the rest are alternative orders that must
+            resolve to the same conanfile (with the pair of unordered requirers that originates
+            each of them). Returns None if the vertex doesn't belong to the requires graph.
+        """
+        in_edges = self.graph.in_edges(vertex, data='require')
         if not in_edges:
-            log.warning(f"Handle root corner case. It is vertex '{vertex}'")
-            return self.provider.get_conanfile(vertex, [])
+            return [(None, [])]
         requires_graph = self.graph.get_requires_graph()
 
         # if the vertex is not in the requires graph, do not get the conanfile
         if not requires_graph.has_node(vertex):
-            log.debug(f"Vertex '{vertex}' doesn't belong to the requires graph")
-            return
+            return None
 
-        # Filter requires by ancestors:
-        requires_ancestors = nx.ancestors(requires_graph, vertex)
+        # Filter requires by ancestors (the origin of a 'topological' edge is one already):
+        others = [ori for ori, _, _ in in_edges if not requires_graph.has_edge(ori, vertex)]
+        requires_ancestors = set(requires_graph.predecessors(vertex))
+        if others:
+            requires_ancestors.update(self.graph.requires_ancestors(vertex, others))
         requires: Dict[str, Require] = {ori: require for ori, _, require in in_edges if ori in requires_ancestors}
-        # We need to consider all the topological orderings and check they resolve to the same
-        #  conanfile, otherwise we have an ambiguity that should be reported as a conflict.
-        candidate_conanfiles: List[ConanFile] = []
-        for topo_order in nx.all_topological_sorts(requires_graph):
-            log.debug(f"Topological order: f{topo_order}")
-            requires_given_order: List[Tuple[str, Require]] = []
-            for it in topo_order:
-                if it == vertex:  # Optimization
-                    break
-                req = requires.get(it, None)
-                if req:
-                    requires_given_order.append((it, req))
-
-            conanfile = self.provider.get_conanfile(vertex, requires_given_order)
-            candidate_conanfiles.append(conanfile)
-
-        # Validate that we get the same conanfile
-        assert len(set(candidate_conanfiles)) == 1, "Multiple conanfiles --> ambiguity!"
-        return candidate_conanfiles[0]
+
+        # Precedence between requirers: 'a' goes before 'b' if 'a' is an ancestor of 'b' in the
+        #  requires graph, the topological order maintained by the graph is a valid order to
+        #  resolve the conanfile.
+        predecessors: Dict[str, Set[str]] = {ori: set() for ori in requires}
+        if len(requires) > 1:
+            for ori in requires:
+                predecessors[ori] = self.graph.requires_ancestors(ori, requires)
+        order: List[str] = sorted(requires, key=self.graph.requires_position)
+        resolution_orders = [(None, [(it, requires[it]) for it in order])]
+
+        # Every other valid order must resolve to the same conanfile, otherwise we have an ambiguity
+        #  that should be reported as a conflict. Instead of enumerating all the orders, for each pair
+        #  of unordered requirers we check the order where the second one goes first, and for each
+        #  requirer the orders where it goes as early and as late as possible (the provider can
+        #  give precedence to the first or to the last constraints). Orders that result in the same
+        #  sequence of constraints are equivalent and checked only once.
+        checked_orders = {self._constraints_key(requires, order)}
+
+        def add_order(pair: Tuple[str, str], alternative_order: List[str]):
+            key = self._constraints_key(requires, alternative_order)
+            if key not in checked_orders:
+                checked_orders.add(key)
+                log.debug("Alternative order: %s", alternative_order)
+                resolution_orders.append((pair, [(it, requires[it]) for it in alternative_order]))
+
+        if len({it.constraint_key() for it in requires.values()}) < 2:
+            return resolution_orders
+
+        for i, ori in enumerate(order):
+            for other in order[i + 1:]:
+                if ori in predecessors[other]:
+                    continue
+                if requires[ori].constraint_key() == requires[other].constraint_key():
+                    continue
+                moved = [it for it in order[i:] if it == other or it in predecessors[other]]
+                add_order((ori, other), order[:i] + moved + [it for it in order[i:] if it not in moved])
+
+        for i, ori in enumerate(order):
+            before = [it for it in order[:i] if it not in predecessors[ori]]
+            after = [it for it in order[i + 1:] if ori not in predecessors[it]]
+            if before:  # As early as possible: only its ancestors go before it
+                first = [it for it in order if it in predecessors[ori]] + [ori]
+                add_order((before[0], ori), first + [it for it in order if it not in first])
+            if after:  # As late as possible: only its descendants go after it
+                last = [ori] + [it for it in order if ori in predecessors[it]]
+                add_order((ori, after[-1]), [it for it in order if it not in last] + last)
+        return resolution_orders
+
+    @staticmethod
+    def _constraints_key(requires: Dict[str, Require], order: List[str]) -> Tuple:
+        return tuple(requires[it].constraint_key() for it in order)
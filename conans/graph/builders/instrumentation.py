@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple, Callable, Union
+
+from ..proxy_types import Provider, Require, ConanFile
+
+
+class Observer:
+    """ Receives the events of the builders (see 'instrument'), 'elapsed' is the time spent
+        in the event including the nested ones (the provider calls made to 'resolve' a vertex,...)
+
+        Events: the visitor ones ('discover_vertex', 'examine_vertex', 'examine_edge',
+        'tree_edge', 'non_tree_edge', 'finish_vertex'), 'resolve' (conanfile for a vertex),
+        'provider' (call to the provider, 'count' is the number of constraints), 'provider_batch'
+        (batch of requests to the provider, 'count' is the number of requests), 'prune'
+        ('count' is the number of nodes discarded) and 'subgraph' (private or build-context
+        requirement, built or reused).
+    """
+
+    def on_event(self, event: str, elapsed: float, vertex: str, target: Optional[str] = None,
+                 count: Optional[int] = None) -> None:
+        raise NotImplementedError
+
+
+class Statistics(Observer):
+    """ Counts and times the events, it can be attached to several runs """
+
+    def __init__(self):
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.times: Dict[str, float] = defaultdict(float)
+        self.resolutions: Dict[str, int] = defaultdict(int)
+        self.pruned_nodes = 0
+        self._lock = threading.Lock()
+
+    def on_event(self, event: str, elapsed: float, vertex: str, target: Optional[str] = None,
+                 count: Optional[int] = None) -> None:
+        with self._lock:
+            self.counts[event] += 1
+            self.times[event] += elapsed
+            if event == 'resolve':
+                self.resolutions[vertex] += 1
+            elif event == 'prune':
+                self.pruned_nodes += count
+
+    def summary(self, top: int = 10) -> str:
+        with self._lock:
+            lines = [f"{'event':<20}{'count':>10}{'total (s)':>12}{'mean (ms)':>12}"]
+            for event in sorted(self.counts, key=lambda it: self.times[it], reverse=True):
+                count, total = self.counts[event], self.times[event]
+                lines.append(f"{event:<20}{count:>10}{total:>12.4f}{total * 1000 / count:>12.4f}")
+            lines.append(f"Nodes discarded by {self.counts['prune']} prune events: {self.pruned_nodes}")
+            lines.append(f"Top {top} vertices by resolution count:")
+            resolutions = sorted(self.resolutions.items(), key=lambda it: it[1], reverse=True)
+            for vertex, count in resolutions[:top]:
+                lines.append(f" - {vertex}: {count}")
+        return "\n".join(lines)
+
+
+# Builder methods that are observed: event and function returning (vertex, target, count)
+_EVENTS: Dict[str, Tuple[str, Callable]] = {
+    'discover_vertex': ('discover_vertex', lambda vertex: (vertex, None, None)),
+    'examine_vertex': ('examine_vertex', lambda vertex: (vertex, None, None)),
+    'finish_vertex': ('finish_vertex', lambda vertex: (vertex, None, None)),
+    'examine_edge': ('examine_edge', lambda origin, target: (origin, target, None)),
+    'tree_edge': ('tree_edge', lambda origin, target: (origin, target, None)),
+    'non_tree_edge': ('non_tree_edge', lambda origin, target: (origin, target, None)),
+    '_get_conanfile': ('resolve', lambda vertex: (vertex, None, None)),
+    '_remove_branch_nodes': ('prune', lambda vertex, branch_nodes: (vertex, None, len(branch_nodes))),
+    '_get_subgraph': ('subgraph', lambda vertex, require: (vertex, require.name, None)),
+}
+
+
+def _observed(func: Callable, event: str, event_args: Callable, observers: List[Observer]) -> Callable:
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            vertex, target, count = event_args(*args, **kwargs)
+            for observer in observers:
+                observer.on_event(event, elapsed, vertex, target, count)
+    return wrapper
+
+
+class ObservedProvider(Provider):
+    """ Reports the calls to the provider, any other attribute is taken from the wrapped one """
+
+    def __init__(self, provider: Provider, observers: List[Observer]):
+        self.provider = provider
+        self.observers = observers
+
+    def __getattr__(self, item):
+        # Only called for missing attributes: 'provider' is missing while unpickling (it would
+        #  recurse forever) and special methods are not taken from the wrapped provider
+        if item == 'provider' or (item.startswith('__') and item.endswith('__')):
+            raise AttributeError(item)
+        return getattr(self.provider, item)
+
+    @property
+    def pure(self) -> bool:
+        return self.provider.pure
+
+    def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]) -> ConanFile:
+        start = time.perf_counter()
+        try:
+            return self.provider.get_conanfile(name, constraints)
+        finally:
+            elapsed = time.perf_counter() - start
+            for observer in self.observers:
+                observer.on_event('provider', elapsed, name, None, len(constraints))
+
+    def get_conanfiles(self, batch: List[Tuple[str, List[Tuple[str, Require]]]]) -> List[Union[ConanFile, Exception]]:
+        start = time.perf_counter()
+        try:
+            return self.provider.get_conanfiles(batch)
+        finally:
+            elapsed = time.perf_counter() - start
+            for observer in self.observers:
+                observer.on_event('provider_batch', elapsed, None, None, len(batch))
+
+
+@contextmanager
+def instrument(builder, observers: Optional[List[Observer]]):
+    """ Reports the events of the builder to the observers while in this context. Without
+        observers the builder is not modified at all, so it costs nothing.
+    """
+    if not observers:
+        yield builder
+        return
+
+    observed = []
+    for name, (event, event_args) in _EVENTS.items():
+        method = getattr(builder, name, None)
+        if method is not None:
+            setattr(builder, name, _observed(method, event, event_args, observers))
+            observed.append(name)
+    provider = builder.provider
+    if not isinstance(provider, ObservedProvider):  # Nested builders already get one
+        builder.provider = ObservedProvider(provider, observers)
+    try:
+        yield builder
+    finally:
+        for name in observed:
+            delattr(builder, name)  # Back to the method of the class
+        builder.provider = provider
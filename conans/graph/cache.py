@@ -0,0 +1,94 @@
+import hashlib
+import io
+import logging
+import os
+import pickle
+import tempfile
+from typing import Optional, Union
+
+from .compact import CompactGraph
+from .graph import Graph
+from .proxy_types import ConanFile
+
+log = logging.getLogger(__name__)
+
+
+class _Pickler(pickle.Pickler):
+    def reducer_override(self, obj):
+        # Conanfiles are stored as plain records (the recipe, with references to the provider
+        #  data, is not needed to use the finished graph)
+        if isinstance(obj, ConanFile) and type(obj) is not ConanFile:
+            return ConanFile, (obj.name, obj.version, obj.options)
+        return NotImplemented
+
+
+def dumps(graph: Union[Graph, CompactGraph]) -> bytes:
+    """ Serialized form of the (finished) graph, the one used by the cache (see 'loads') """
+    compact = graph.compact() if isinstance(graph, Graph) else graph
+    f = io.BytesIO()
+    _Pickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(compact)
+    return f.getvalue()
+
+
+def loads(data: bytes) -> CompactGraph:
+    return pickle.loads(data)
+
+
+class GraphCache:
+    """ Finished graphs stored in a directory, one file per key. The key must identify all the
+        inputs of the resolution (root recipe, recipes available in the provider,...), see
+        'GraphCache.key'.
+
+        Graphs are stored using the array-backed layout of 'CompactGraph' (pickled) and the
+        conanfiles are stored as plain 'ConanFile' records (name, version and options): the
+        graph loaded has the result of the resolution, not the recipes.
+    """
+    # Part of every key, increase it when the layout of the files changes
+    FORMAT = 1
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @classmethod
+    def key(cls, *inputs: Union[str, bytes]) -> str:
+        """ Content hash of the given inputs (their contents, not the name of the files) """
+        sha = hashlib.sha256(f"conan-graph-cache-{cls.FORMAT}".encode())
+        for it in inputs:
+            it = it.encode() if isinstance(it, str) else it
+            sha.update(len(it).to_bytes(8, 'little'))
+            sha.update(it)
+        return sha.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.graph")
+
+    def __contains__(self, key: str) -> bool:
+        return os.path.exists(self._path(key))
+
+    def load(self, key: str) -> Optional[CompactGraph]:
+        """ Returns the graph stored for this key (use 'to_networkx' to get a 'Graph'), or None """
+        try:
+            with open(self._path(key), 'rb') as f:
+                graph = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # Corrupted or written by an incompatible version: resolve again
+            log.warning(f"Cannot load graph '{key}' from the cache: {e}")
+            return None
+        log.debug("GraphCache::load(key='%s')", key)
+        return graph
+
+    def save(self, key: str, graph: Union[Graph, CompactGraph]):
+        """ Stores the graph (atomically, concurrent readers see the previous file or the new one) """
+        log.debug("GraphCache::save(key='%s')", key)
+        data = dumps(graph)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
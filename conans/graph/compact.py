@@ -0,0 +1,189 @@
+import logging
+from array import array
+from collections import deque
+from typing import Dict, List, Tuple, Optional, Iterator, Hashable
+
+from .graph import Graph
+from .proxy_types import EdgeType, Require, ConanFile
+
+log = logging.getLogger(__name__)
+
+_EDGE_TYPES = list(EdgeType)
+_EDGE_TYPE_CODE = {edge_type: code for code, edge_type in enumerate(_EDGE_TYPES)}
+
+
+class CompactGraph:
+    """ Read-only storage for a finished graph (see 'Graph.compact'): nodes are identified by
+        integers, the adjacency is stored in CSR arrays per edge type and the flags in columnar
+        arrays. It is much cheaper to traverse and to keep in memory than the networkx graph,
+        which can be created again on demand with 'to_networkx' (to write the DOT file,...)
+
+        Node and edge ids follow the order of the networkx graph. The methods taking a node
+        name are convenient for the consumers, hot loops should work with the ids and the
+        arrays returned by 'adjacency' directly.
+    """
+
+    def __init__(self):
+        self.nodes: List[str] = []  # Node id -> name
+        self._ids: Dict[str, int] = {}
+        self.conanfiles: List[Optional[ConanFile]] = []
+        self.node_enabled = bytearray()
+
+        # Edges (columnar): edge id -> source, target, type, enabled and require
+        self.edge_sources = array('i')
+        self.edge_targets = array('i')
+        self.edge_types = array('b')
+        self.edge_enabled = bytearray()
+        self.requires: List[Require] = []
+
+        # Adjacency per edge type: (offsets, targets, edge ids), successors of node 'i' are
+        #  'targets[offsets[i]:offsets[i + 1]]'
+        self._out: Dict[EdgeType, Tuple[array, array, array]] = {}
+        self._in: Dict[EdgeType, Tuple[array, array, array]] = {}
+
+        self.context = 0
+        self._subgraphs: Dict[int, List[Tuple["CompactGraph", Require]]] = {}
+
+    @classmethod
+    def from_graph(cls, graph: Graph, _converted: Optional[Dict[int, "CompactGraph"]] = None) -> "CompactGraph":
+        """ Subgraphs are converted too, keeping the ones that are shared by reference shared """
+        converted = {} if _converted is None else _converted
+        compact = cls()
+        converted[id(graph)] = compact
+        compact.context = graph.context
+
+        for node, data in graph.nodes(data=True):
+            compact._ids[node] = len(compact.nodes)
+            compact.nodes.append(node)
+            compact.conanfiles.append(data.get('conanfile'))
+            compact.node_enabled.append(bool(data.get('enabled', False)))
+
+        ids = compact._ids
+        for u, v, data in graph.edges(data=True):
+            require = data['require']
+            compact.edge_sources.append(ids[u])
+            compact.edge_targets.append(ids[v])
+            compact.edge_types.append(_EDGE_TYPE_CODE[require.edge_type])
+            compact.edge_enabled.append(bool(data.get('enabled', True)))
+            compact.requires.append(require)
+
+        for code, edge_type in enumerate(_EDGE_TYPES):
+            edges = [e for e, it in enumerate(compact.edge_types) if it == code]
+            compact._out[edge_type] = compact._csr(edges, compact.edge_sources, compact.edge_targets)
+            compact._in[edge_type] = compact._csr(edges, compact.edge_targets, compact.edge_sources)
+
+        for vertex, subgraphs in graph._subgraphs.items():
+            compact._subgraphs[ids[vertex]] = [
+                (converted[id(sg)] if id(sg) in converted else cls.from_graph(sg, converted), require)
+                for sg, require in subgraphs]
+        return compact
+
+    def _csr(self, edges: List[int], sources: array, targets: array) -> Tuple[array, array, array]:
+        """ Counting sort of the edges by source, stable (keeps the order of the edges) """
+        offsets = array('i', bytes(4 * (len(self.nodes) + 1)))
+        for e in edges:
+            offsets[sources[e] + 1] += 1
+        for i in range(len(self.nodes)):
+            offsets[i + 1] += offsets[i]
+        position = offsets[:-1]
+        sorted_edges = array('i', bytes(4 * len(edges)))
+        for e in edges:
+            sorted_edges[position[sources[e]]] = e
+            position[sources[e]] += 1
+        return offsets, array('i', (targets[e] for e in sorted_edges)), sorted_edges
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.nodes)
+
+    def __contains__(self, vertex: Hashable) -> bool:
+        return vertex in self._ids
+
+    def node_id(self, vertex: str) -> int:
+        return self._ids[vertex]
+
+    def number_of_edges(self) -> int:
+        return len(self.requires)
+
+    def conanfile(self, vertex: str) -> Optional[ConanFile]:
+        return self.conanfiles[self._ids[vertex]]
+
+    def is_enabled(self, vertex: str) -> bool:
+        return bool(self.node_enabled[self._ids[vertex]])
+
+    def adjacency(self, edge_type: EdgeType = EdgeType.topological,
+                  reverse: bool = False) -> Tuple[array, array, array]:
+        """ CSR arrays (offsets, targets, edge ids) for the edges of the given type, for the
+            in-edges if 'reverse'
+        """
+        return self._in[edge_type] if reverse else self._out[edge_type]
+
+    def successors(self, vertex: str, edge_type: EdgeType = EdgeType.topological) -> List[str]:
+        offsets, targets, _ = self._out[edge_type]
+        i = self._ids[vertex]
+        return [self.nodes[it] for it in targets[offsets[i]:offsets[i + 1]]]
+
+    def predecessors(self, vertex: str, edge_type: EdgeType = EdgeType.topological) -> List[str]:
+        offsets, sources, _ = self._in[edge_type]
+        i = self._ids[vertex]
+        return [self.nodes[it] for it in sources[offsets[i]:offsets[i + 1]]]
+
+    def edges(self, edge_type: Optional[EdgeType] = None) -> Iterator[Tuple[str, str, Require, bool]]:
+        """ Edges as (u, v, require, enabled), in the order of the networkx graph """
+        code = None if edge_type is None else _EDGE_TYPE_CODE[edge_type]
+        for e, require in enumerate(self.requires):
+            if code is None or self.edge_types[e] == code:
+                yield (self.nodes[self.edge_sources[e]], self.nodes[self.edge_targets[e]],
+                       require, bool(self.edge_enabled[e]))
+
+    def subgraphs(self, vertex: str) -> List[Tuple["CompactGraph", Require]]:
+        return self._subgraphs.get(self._ids[vertex], [])
+
+    def topological_order(self) -> List[str]:
+        """ Enabled nodes sorted so every node comes after the nodes it requires (through the
+            enabled topological edges), the order to build them.
+        """
+        offsets, targets, edge_ids = self._in[EdgeType.topological]
+        pending = array('i', bytes(4 * len(self.nodes)))  # Requirements not sorted yet
+        for e in edge_ids:
+            if self.edge_enabled[e]:
+                pending[self.edge_sources[e]] += 1
+        queue = deque(i for i in range(len(self.nodes)) if self.node_enabled[i] and not pending[i])
+        order = []
+        while queue:
+            i = queue.popleft()
+            order.append(self.nodes[i])
+            for j in range(offsets[i], offsets[i + 1]):
+                if self.edge_enabled[edge_ids[j]]:
+                    pending[targets[j]] -= 1
+                    if not pending[targets[j]] and self.node_enabled[targets[j]]:
+                        queue.append(targets[j])
+        return order
+
+    def to_networkx(self, _converted: Optional[Dict[int, Graph]] = None) -> Graph:
+        """ Creates the (equivalent) networkx graph, with the same subgraphs """
+        converted = {} if _converted is None else _converted
+        graph = Graph(context=self.context)
+        converted[id(self)] = graph
+        for i, node in enumerate(self.nodes):
+            data = {}
+            if self.conanfiles[i] is not None:
+                data['conanfile'] = self.conanfiles[i]
+            if self.node_enabled[i]:
+                data['enabled'] = True
+            graph.add_node(node, **data)
+        for e, require in enumerate(self.requires):
+            data = {'require': require}
+            if not self.edge_enabled[e]:
+                data['enabled'] = False
+            graph.add_edge(self.nodes[self.edge_sources[e]], self.nodes[self.edge_targets[e]], **data)
+        for i, subgraphs in self._subgraphs.items():
+            for sg, require in subgraphs:
+                sg = converted[id(sg)] if id(sg) in converted else sg.to_networkx(converted)
+                graph.add_subgraph(self.nodes[i], sg, require)
+        return graph
+
+    def write_dot(self, output: str, **kwargs):
+        Graph.write_dot(self.to_networkx(), output, **kwargs)
@@ -0,0 +1,101 @@
+"""
+Exporters for the finished graphs that write directly to a stream: they walk the graph and its
+subgraphs (iteratively) without creating any intermediate graph like 'Graph.printable_graph'
+does. Nodes and edges are the same ones (with the same attributes) as the ones in the printable
+graph, nodes in the subgraphs are scoped with the vertex that requires them ('lib::cmake').
+"""
+import json
+from typing import Dict, Iterator, TextIO, Tuple, Optional
+
+from .graph import Graph
+from .proxy_types import EdgeType
+
+
+def _records(graph: Graph, collapse_subgraphs: bool = False,
+             skip_disabled: bool = False) -> Iterator[Tuple[str, str, Optional[str], Dict]]:
+    """ Yields the nodes ('node', name, None, attributes) and the edges ('edge', u, v, attributes).
+        If 'collapse_subgraphs', a subgraph shared by several vertices is written only once (the
+        first time) and the rest of the vertices require the same nodes.
+    """
+    emitted: Dict[int, str] = {}  # Subgraph already written -> its root node
+    stack = [('graph', graph, "", None)]
+    while stack:
+        item = stack.pop()
+        if item[0] == 'link':
+            _, vertex, target, require = item
+            yield 'edge', vertex, target, {'color': 'red', 'label': str(require),
+                                           'edge_type': require.edge_type.name, 'enabled': True, 'subgraph': True}
+            continue
+
+        _, g, scope, _ = item
+        disabled = set()
+        for node, data in g.nodes(data=True):
+            if data.get('enabled', False):
+                conanfile = data.get('conanfile')
+                yield 'node', f"{scope}{node}", None, {'label': f"{scope}{conanfile}", 'enabled': True}
+            elif skip_disabled:
+                disabled.add(node)
+            else:
+                yield 'node', f"{scope}{node}", None, {'style': 'dotted', 'enabled': False}
+
+        for u, v, data in g.edges(data=True):
+            enabled = data.get('enabled', True)
+            if skip_disabled and (not enabled or u in disabled or v in disabled):
+                continue
+            require = data['require']
+            style, color = "solid", "black"
+            if not enabled:
+                style = "dotted"
+            elif require.edge_type == EdgeType.override:
+                color = "blue"
+            yield 'edge', f"{scope}{u}", f"{scope}{v}", {'style': style, 'color': color, 'label': str(require),
+                                                         'edge_type': require.edge_type.name, 'enabled': enabled}
+
+        # Subgraphs (and the edges to them) are written after this graph, in the same order
+        pending = []
+        for vertex, subgraphs in g.get_subgraphs().items():
+            vertex = f"{scope}{vertex}"
+            for sg, require in subgraphs:
+                target = f"{vertex}::{require.name}"
+                if collapse_subgraphs:
+                    if id(sg) in emitted:
+                        pending.append(('link', vertex, emitted[id(sg)], require))
+                        continue
+                    emitted[id(sg)] = target
+                pending.append(('graph', sg, f"{vertex}::", None))
+                pending.append(('link', vertex, target, require))
+        stack.extend(reversed(pending))
+
+
+def _quote(value) -> str:
+    value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return f'"{value}"'
+
+
+def write_dot(graph: Graph, stream: TextIO, collapse_subgraphs: bool = False, skip_disabled: bool = False,
+              rankdir: str = 'BT'):
+    """ Writes the graph in DOT format (no need for pygraphviz) """
+    stream.write("strict digraph {\n")
+    stream.write(f"graph [rankdir={rankdir}];\n")
+    for kind, u, v, data in _records(graph, collapse_subgraphs, skip_disabled):
+        attributes = ", ".join(f"{key}={_quote(value)}" for key, value in data.items()
+                               if key in ('label', 'style', 'color'))
+        if kind == 'node':
+            stream.write(f"{_quote(u)} [{attributes}];\n")
+        else:
+            stream.write(f"{_quote(u)} -> {_quote(v)} [{attributes}];\n")
+    stream.write("}\n")
+
+
+def write_jsonl(graph: Graph, stream: TextIO, collapse_subgraphs: bool = False, skip_disabled: bool = False):
+    """ Writes the graph as JSON lines, one object per node and edge (in this order) """
+    for kind, u, v, data in _records(graph, collapse_subgraphs, skip_disabled):
+        if kind == 'node':
+            record = {'type': 'node', 'id': u, 'enabled': data['enabled']}
+            if 'label' in data:
+                record['label'] = data['label']
+        else:
+            record = {'type': 'edge', 'source': u, 'target': v, 'edge_type': data['edge_type'],
+                      'enabled': data['enabled'], 'subgraph': data.get('subgraph', False), 'label': data['label']}
+        stream.write(json.dumps(record))
+        stream.write("\n")
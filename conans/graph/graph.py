@@ -1,9 +1,12 @@
+import heapq
 import logging
 from collections import defaultdict
+from concurrent.futures import Future
+from typing import Dict, Iterable, Set, Optional, List, Tuple
 
 import networkx as nx
 
-from .proxy_types import EdgeType
+from .proxy_types import EdgeType, Require
 
 log = logging.getLogger(__name__)
 
@@ -12,6 +15,15 @@ log = logging.getLogger(__name__)
 class Graph(nx.DiGraph):
 
     def __init__(self, context: int = 0, *args, **kwargs):
+        # Materialized graph with only the 'topological' edges (and the nodes they connect), it is
+        #  kept up to date by the methods that add/remove edges and nodes. Modifying the 'require'
+        #  of an edge in place is not tracked, use 'add_edge' again instead.
+        self._requires = nx.DiGraph()
+        # Online topological order of the requires graph (Pearce-Kelly): a requirer has always a
+        #  lower position than its requirements, positions are unique but not consecutive.
+        self._positions: Dict[str, int] = {}
+        self._lowest_position = 0
+        self._highest_position = -1
         super().__init__(context=context, *args, **kwargs)
         self._subgraphs = defaultdict(list)
 
@@ -20,36 +32,268 @@ class Graph(nx.DiGraph):
         return self.graph['context']
 
     def add_subgraph(self, vertex, graph: "Graph", require):
+        """ Subgraphs can be shared by reference between several vertices (and graphs) """
         self._subgraphs[vertex].append((graph, require))
 
-    def get_requires_graph(self):
-        """ Returns the graph taking into account only actual 'requirements' """
-        requires_edges = [(u, v) for (u, v, requires) in self.edges(data='require')
-                          if requires.edge_type == EdgeType.topological]
-        return self.edge_subgraph(requires_edges)
+    def remove_subgraphs(self, vertex):
+        self._subgraphs.pop(vertex, None)
 
-    def finish_graph(self):
+    def get_subgraphs(self) -> Dict[str, List[Tuple["Graph", Require]]]:
+        """ Subgraphs for each vertex (it is the dict maintained internally, it must not be modified) """
+        return self._subgraphs
+
+    def join_subgraphs(self):
+        """ Subgraphs can be added as futures (built concurrently), wait for all of them """
+        for vertex, subgraphs in self._subgraphs.items():
+            self._subgraphs[vertex] = [(g.result() if isinstance(g, Future) else g, require)
+                                       for g, require in subgraphs]
+
+    def add_edge(self, u_of_edge, v_of_edge, **attr):
+        """ Raises (and the graph is not modified) if the edge closes a cycle of requirements """
+        self._order_edge(u_of_edge, v_of_edge, attr.get('require'))
+        super().add_edge(u_of_edge, v_of_edge, **attr)
+        self._index_edge(u_of_edge, v_of_edge)
+
+    def add_edges_from(self, ebunch_to_add, **attr):
+        for e in ebunch_to_add:
+            u, v, data = e if len(e) == 3 else (e[0], e[1], {})
+            self.add_edge(u, v, **{**attr, **data})
+
+    def remove_edge(self, u, v):
+        super().remove_edge(u, v)
+        self._unindex_edge(u, v)
+
+    def remove_edges_from(self, ebunch):
+        ebunch = list(ebunch)
+        super().remove_edges_from(ebunch)
+        for e in ebunch:
+            self._unindex_edge(e[0], e[1])
+
+    def remove_node(self, n):
+        super().remove_node(n)
+        self._unindex_nodes([n])
+        self.remove_subgraphs(n)
+
+    def remove_nodes_from(self, nodes):
+        nodes = list(nodes)
+        super().remove_nodes_from(nodes)
+        self._unindex_nodes(nodes)
+        for n in nodes:
+            self.remove_subgraphs(n)
+
+    def clear(self):
+        super().clear()
+        self._requires.clear()
+        self._positions.clear()
+        self._subgraphs.clear()
+
+    def _index_edge(self, u, v):
+        require = self.edges[u, v].get('require')
+        if require is not None and require.edge_type == EdgeType.topological:
+            self._requires.add_edge(u, v)
+        else:
+            self._unindex_edge(u, v)
+
+    def _order_edge(self, u, v, require: Optional[Require]):
+        """ Updates the positions of the nodes for a new requirement 'u' -> 'v', only the nodes
+            between them in the current order (the affected region) are visited and reordered.
+        """
+        if require is None or require.edge_type != EdgeType.topological or self._requires.has_edge(u, v):
+            return
+        positions = self._positions
+        if u == v:
+            raise Exception(f"There is cycle involving '{v}' and '{u}': {u} -> {v}")
+        if u not in positions:  # Place it before (and 'v' after) everything else
+            self._lowest_position -= 1
+            positions[u] = self._lowest_position
+        if v not in positions:
+            self._highest_position += 1
+            positions[v] = self._highest_position
+        lower, upper = positions[v], positions[u]
+        if lower > upper:
+            return
+
+        # Nodes reachable from 'v' placed before 'u', if 'u' is one of them there is a cycle
+        forward: Dict[str, Optional[str]] = {v: None}  # Node -> node it is reached from
+        stack = [v]
+        while stack:
+            node = stack.pop()
+            for it in self._requires.successors(node):
+                if it == u:
+                    path = [node]
+                    while forward[path[-1]] is not None:
+                        path.append(forward[path[-1]])
+                    cycle = [u] + path[::-1] + [u]
+                    raise Exception(f"There is cycle involving '{v}' and '{u}': {' -> '.join(cycle)}")
+                if it not in forward and positions[it] < upper:
+                    forward[it] = node
+                    stack.append(it)
+
+        # Nodes that reach 'u' placed after 'v'
+        backward = {u}
+        stack = [u]
+        while stack:
+            for it in self._requires.predecessors(stack.pop()):
+                if it not in backward and positions[it] > lower:
+                    backward.add(it)
+                    stack.append(it)
+
+        # Both sets take the same positions, the ones reaching 'u' go first
+        nodes = sorted(backward, key=positions.__getitem__) + sorted(forward, key=positions.__getitem__)
+        for node, position in zip(nodes, sorted(positions[it] for it in nodes)):
+            positions[node] = position
+
+    def _unindex_edge(self, u, v):
+        if self._requires.has_edge(u, v):
+            self._requires.remove_edge(u, v)
+            isolated = [n for n in (u, v) if not self._requires.degree(n)]
+            self._requires.remove_nodes_from(isolated)
+            for n in isolated:
+                self._positions.pop(n, None)
+
+    def _unindex_nodes(self, nodes: Iterable[str]):
+        nodes = [n for n in nodes if n in self._requires]
+        if nodes:
+            neighbors = {m for n in nodes for m in nx.all_neighbors(self._requires, n)}
+            self._requires.remove_nodes_from(nodes)
+            self._requires.remove_nodes_from([n for n in neighbors if n in self._requires
+                                              and not self._requires.degree(n)])
+            for n in nodes:
+                self._positions.pop(n, None)
+            for n in neighbors:
+                if n not in self._requires:
+                    self._positions.pop(n, None)
+
+    def get_requires_graph(self) -> nx.DiGraph:
+        """ Returns the graph taking into account only actual 'requirements' (it is the graph
+            maintained internally, it must not be modified)
+        """
+        return self._requires
+
+    def requires_position(self, vertex) -> int:
+        """ Position of the vertex in the topological order of the requires graph: lower than the
+            position of any of its requirements (positions are not consecutive)
+        """
+        return self._positions[vertex]
+
+    def topological_order(self) -> List[str]:
+        """ Nodes of the requires graph, every node goes before the nodes it requires """
+        return sorted(self._positions, key=self._positions.__getitem__)
+
+    def requires_ancestors(self, vertex, candidates: Optional[Iterable[str]] = None) -> Set[str]:
+        """ Ancestors of the vertex in the requires graph. If 'candidates' are given, only the
+            ones that are ancestors are returned: the search doesn't go above the first of them
+            in the topological order and it stops once all of them are found (nodes closer to
+            the top are visited first). Ancestors are not cached (all of them would take O(V^2)
+            memory, 350MB for a chain of 4000 nodes), each call visits at most the nodes between
+            the vertex and the candidates (all the ancestors if there are no candidates).
+        """
+        if vertex not in self._requires:
+            return set()
+        positions = self._positions
+        if candidates is None:
+            ancestors = set()
+            stack = [vertex]
+            while stack:
+                for it in self._requires.predecessors(stack.pop()):
+                    if it not in ancestors:
+                        ancestors.add(it)
+                        stack.append(it)
+            return ancestors
+
+        pending = {it for it in candidates if it in positions and it != vertex}
+        limit = min((positions[it] for it in pending), default=None)
+        found = set()
+        visited = {vertex}
+        heap = [(positions[vertex], vertex)]
+        while heap and pending:
+            _, node = heapq.heappop(heap)
+            for it in self._requires.predecessors(node):
+                if it not in visited and positions[it] >= limit:
+                    visited.add(it)
+                    if it in pending:
+                        pending.discard(it)
+                        found.add(it)
+                    heapq.heappush(heap, (positions[it], it))
+        return found
+
+    def _requires_distances(self, source, targets: Set[str]) -> Dict[str, int]:
+        """ Length of the shortest path (requires graph) from source to each reachable target """
+        distances = {}
+        pending = set(targets)
+        # Nodes placed after all the targets in the topological order cannot reach any of them
+        limit = max((self._positions[it] for it in targets if it in self._positions), default=None)
+        if limit is None:
+            return distances
+        level = [source]
+        visited = {source}
+        depth = 0
+        while level and pending:
+            for node in level:
+                if node in pending:
+                    pending.discard(node)
+                    distances[node] = depth
+            next_level = []
+            for node in level:
+                for it in self._requires.successors(node):
+                    if it not in visited and self._positions[it] <= limit:
+                        visited.add(it)
+                        next_level.append(it)
+            level = next_level
+            depth += 1
+        return distances
+
+    def finish_graph(self, vertices: Optional[Iterable[str]] = None):
+        """ Enables the nodes in the requires graph and disables the edges that are not used. If
+            'vertices' are given, only these nodes and the edges to them are updated (the rest of
+            the graph must have been finished before and not modified since then).
+        """
         requires_graph = self.get_requires_graph()
-        nx.set_node_attributes(self, {n: {'enabled': True} for n in requires_graph.nodes()})
-        overrides_by_target = defaultdict(list)
-        for (u, v, require) in self.edges(data='require'):
+        if vertices is None:
+            nodes = requires_graph.nodes()
+            edges = self.edges(data='require')
+        else:
+            vertices = [v for v in vertices if v in self]
+            nodes = [v for v in vertices if requires_graph.has_node(v)]
+            edges = list(self.in_edges(vertices, data='require'))
+            for u, v, _ in edges:
+                self.edges[u, v].pop('enabled', None)
+        nx.set_node_attributes(self, {n: {'enabled': True} for n in nodes})
+        disabled_edges = []
+        overrides = []
+        for (u, v, require) in edges:
             if not requires_graph.has_node(u) or not requires_graph.has_node(v):
-                self.edges[(u, v)]['enabled'] = False
+                disabled_edges.append((u, v))
             elif require.edge_type == EdgeType.override:
-                try:
-                    spath_len = nx.shortest_path_length(requires_graph, u, v)
-                except nx.exception.NetworkXNoPath:
-                    self.edges[(u, v)]['enabled'] = False
-                else:
-                    overrides_by_target[v].append((spath_len, u))
+                overrides.append((u, v))
+
+        # Distances for all the overrides from the same node are computed at once
+        targets_by_source = defaultdict(set)
+        for u, v in overrides:
+            targets_by_source[u].add(v)
+        distances = {u: self._requires_distances(u, targets) for u, targets in targets_by_source.items()}
+
+        overrides_by_target = defaultdict(list)
+        for u, v in overrides:
+            spath_len = distances[u].get(v)
+            if spath_len is None:
+                disabled_edges.append((u, v))
+            else:
+                overrides_by_target[v].append((spath_len, u))
 
         # If there are different overrides to one single node, only one is used
         #  (otherwise, it should have raised a conflict)
         for v, ori_requires in overrides_by_target.items():
             if len(ori_requires) > 1:
                 ordered_requires = sorted(ori_requires, key=lambda x: x[0], reverse=True)
-                for _, u in ordered_requires[1:]:
-                    self.edges[(u, v)]['enabled'] = False
+                disabled_edges.extend((u, v) for _, u in ordered_requires[1:])
+
+        nx.set_edge_attributes(self, dict.fromkeys(disabled_edges, False), 'enabled')
+
+    def compact(self) -> "CompactGraph":
+        """ Read-only copy of the (finished) graph using an array-backed storage """
+        from .compact import CompactGraph
+        return CompactGraph.from_graph(self)
 
     @staticmethod
     def printable_graph(graph: "Graph", scope=""):
@@ -91,8 +335,9 @@ class Graph(nx.DiGraph):
         return printable
 
     @staticmethod
-    def write_dot(graph: "Graph", output: str):
+    def write_dot(graph: "Graph", output: str, **kwargs):
+        """ Writes the graph (and the subgraphs) to a DOT file, see 'export.write_dot' for the options """
         log.debug(f"Graph::write_dot(graph, output='{output}')")
-        graph = Graph.printable_graph(graph)
-        graph.graph['graph'] = {'rankdir': 'BT'}
-        nx.drawing.nx_agraph.write_dot(graph, output)
+        from .export import write_dot
+        with open(output, 'w') as f:
+            write_dot(graph, f, **kwargs)
@@ -0,0 +1,184 @@
+import asyncio
+import logging
+import threading
+from collections import OrderedDict
+from typing import List, Tuple, Optional, Hashable, Dict, Any, Union, Iterable
+
+from .proxy_types import Provider, Require, ConanFile, AsyncProvider
+
+log = logging.getLogger(__name__)
+
+
+def request_key(provider: Provider, name: str, constraints: List[Tuple[str, Require]]) -> Hashable:
+    """ Identifies a request to the provider, the origin of the constraints is taken into
+        account only if the provider is not pure
+    """
+    if provider.pure:
+        return name, tuple(require.constraint_key() for _, require in constraints)
+    return name, tuple((ori, require.constraint_key()) for ori, require in constraints)
+
+
+class CachingProvider(Provider):
+    """ Wraps a provider memoizing the conanfiles it returns, the key is the name and the
+        sequence of constraints (without the origin of them). The least recently used entries
+        are evicted when the cache grows over 'maxsize' (None for an unbounded cache).
+    """
+
+    def __init__(self, provider: Provider, maxsize: Optional[int] = 1024):
+        self.provider = provider
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    @property
+    def pure(self) -> bool:
+        return self.provider.pure
+
+    def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]) -> ConanFile:
+        if not self.provider.pure:
+            return self.provider.get_conanfile(name, constraints)
+
+        key = request_key(self.provider, name, constraints)
+        with self._lock:
+            try:
+                conanfile = self._cache[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                log.debug("CachingProvider::get_conanfile(name='%s'): cache hit", name)
+                self.hits += 1
+                self._cache.move_to_end(key)
+                return conanfile
+
+        conanfile = self.provider.get_conanfile(name, constraints)
+        with self._lock:
+            self._cache[key] = conanfile
+            if self.maxsize is not None and len(self._cache) > self.maxsize:
+                self._cache.popitem(last=False)
+        return conanfile
+
+    def get_conanfiles(self, batch: List[Tuple[str, List[Tuple[str, Require]]]]) -> List[Union[ConanFile, Exception]]:
+        if not self.provider.pure:
+            return self.provider.get_conanfiles(batch)
+
+        # Only the requests not in the cache are sent to the provider (in a single batch)
+        conanfiles = [None] * len(batch)
+        misses = {}
+        with self._lock:
+            for i, (name, constraints) in enumerate(batch):
+                key = request_key(self.provider, name, constraints)
+                conanfile = self._cache.get(key)
+                if conanfile is None:
+                    self.misses += 1
+                    misses.setdefault(key, []).append(i)
+                else:
+                    self.hits += 1
+                    self._cache.move_to_end(key)
+                    conanfiles[i] = conanfile
+        if misses:
+            results = self.provider.get_conanfiles([batch[positions[0]] for positions in misses.values()])
+            with self._lock:
+                for (key, positions), conanfile in zip(misses.items(), results):
+                    for i in positions:
+                        conanfiles[i] = conanfile
+                    if not isinstance(conanfile, Exception):
+                        self._cache[key] = conanfile
+                if self.maxsize is not None:
+                    while len(self._cache) > self.maxsize:
+                        self._cache.popitem(last=False)
+        return conanfiles
+
+    def invalidate(self, names: Iterable[str]):
+        """ Forgets the conanfiles returned for these packages (their recipes have changed) """
+        names = set(names)
+        with self._lock:
+            for key in [it for it in self._cache if it[0] in names]:
+                del self._cache[key]
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class SyncProvider(Provider):
+    """ Synchronous interface to an AsyncProvider whose requests are awaited in the event loop
+        'loop', it has to be used from a different thread. Conanfiles can be requested in
+        advance ('prefetch') and they are fetched concurrently, each prefetched result is
+        used (and discarded) by the first 'get_conanfile' with the same arguments.
+    """
+    _missing = object()
+
+    def __init__(self, provider: AsyncProvider, loop: asyncio.AbstractEventLoop, max_concurrency: int = 8):
+        self.provider = provider
+        self.loop = loop
+        self.max_concurrency = max_concurrency
+        self._prefetched: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def pure(self) -> bool:
+        return self.provider.pure
+
+    def _key(self, name: str, constraints: List[Tuple[str, Require]]) -> Hashable:
+        return request_key(self.provider, name, constraints)
+
+    def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]) -> ConanFile:
+        with self._lock:
+            result = self._prefetched.pop(self._key(name, constraints), self._missing)
+        if result is self._missing:
+            future = asyncio.run_coroutine_threadsafe(self.provider.get_conanfile(name, constraints), self.loop)
+            return future.result()
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def get_conanfiles(self, batch: List[Tuple[str, List[Tuple[str, Require]]]]) -> List[Union[ConanFile, Exception]]:
+        """ The requests in the batch are fetched concurrently """
+        self.prefetch(batch)
+        conanfiles = []
+        for name, constraints in batch:
+            try:
+                conanfiles.append(self.get_conanfile(name, constraints))
+            except Exception as e:
+                conanfiles.append(e)
+        return conanfiles
+
+    def prefetch(self, requests: List[Tuple[str, List[Tuple[str, Require]]]]):
+        """ Fetch concurrently the conanfiles for these requests (name and constraints) """
+        pending = {}
+        with self._lock:
+            for name, constraints in requests:
+                key = self._key(name, constraints)
+                if key not in self._prefetched:
+                    pending.setdefault(key, (name, constraints))
+        if not pending:
+            return
+        log.debug("SyncProvider::prefetch(requests (%s))", len(pending))
+        future = asyncio.run_coroutine_threadsafe(self._fetch_all(list(pending.values())), self.loop)
+        results = future.result()
+        with self._lock:
+            self._prefetched.update(zip(pending.keys(), results))
+
+    async def _fetch_all(self, requests: List[Tuple[str, List[Tuple[str, Require]]]]) -> List[Any]:
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def fetch(name, constraints):
+            async with semaphore:
+                return await self.provider.get_conanfile(name, constraints)
+
+        # Errors are raised when (and if) the conanfile is actually requested
+        return await asyncio.gather(*[fetch(name, constraints) for name, constraints in requests],
+                                    return_exceptions=True)
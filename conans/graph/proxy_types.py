@@ -1,5 +1,7 @@
+import weakref
+from collections.abc import Mapping
 from enum import Enum, auto
-from typing import Dict, List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional, Iterator, Union
 
 
 class AutoName(Enum):
@@ -39,18 +41,104 @@ class Context(AutoName):
     other = auto()
 
 
+class Options(Mapping):
+    """ Immutable mapping of options (hashable). Equal options are shared: instances are interned
+        and the empty one is a singleton, so they can be used as defaults.
+    """
+    __slots__ = ('_data', '_hash', '__weakref__')
+    _interned = weakref.WeakValueDictionary()
+
+    def __new__(cls, data: Optional[Dict[str, str]] = None) -> "Options":
+        if isinstance(data, Options):
+            return data
+        items = tuple(data.items()) if data else ()
+        options = cls._interned.get(items)
+        if options is None:
+            options = super().__new__(cls)
+            options._data = dict(items)
+            options._hash = hash(frozenset(items))
+            options = cls._interned.setdefault(items, options)
+        return options
+
+    def __getitem__(self, key: str) -> str:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Options):
+            return self is other or (self._hash == other._hash and self._data == other._data)
+        return isinstance(other, Mapping) and self._data == dict(other.items())
+
+    def __reduce__(self):
+        return Options, (self._data,)
+
+    def __repr__(self):
+        return repr(self._data)
+
+
 class Require:
+    """ Requirement declared by a conanfile. Requires are immutable and compared by value (see
+        'constraint_key'), use 'Require.interned' to share the equal ones.
+    """
+    __slots__ = ('name', 'version_expr', 'edge_type', 'require_type', 'visibility', 'context', 'options',
+                 '_key', '_hash', '__weakref__')
+    _interned = weakref.WeakValueDictionary()
+
     name: str
-    version_expr: str
-    edge_type: EdgeType = None
+    version_expr: Optional[str]
+    edge_type: EdgeType
 
     # A topological require will define these properties
-    require_type: Optional[RequireType] = None
-    visibility: Optional[Visibility] = None
-    context: Optional[Context] = None
+    require_type: Optional[RequireType]
+    visibility: Optional[Visibility]
+    context: Optional[Context]
 
     # Options can be defined by a topological or overrides relation
-    options: Dict[str, str] = {}
+    options: Options
+
+    def __init__(self, name: str, version_expr: Optional[str] = None, edge_type: Optional[EdgeType] = None,
+                 require_type: Optional[RequireType] = None, visibility: Optional[Visibility] = None,
+                 context: Optional[Context] = None, options: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.version_expr = version_expr
+        self.edge_type = edge_type
+        self.require_type = require_type
+        self.visibility = visibility
+        self.context = context
+        self.options = Options(options)
+        self._key = (name, version_expr, edge_type, require_type, visibility, context, self.options)
+        self._hash = hash(self._key)
+
+    @classmethod
+    def interned(cls, *args, **kwargs) -> "Require":
+        """ Returns the shared instance equal to 'Require(*args, **kwargs)' """
+        require = cls(*args, **kwargs)
+        return cls._interned.setdefault(require._key, require)
+
+    def constraint_key(self) -> Tuple:
+        """ Hashable value identifying the constraint this require imposes (two requires with
+            the same key are interchangeable for the provider, no matter where they come from)
+        """
+        return self._key
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Require):
+            return NotImplemented
+        return self is other or (self._hash == other._hash and self._key == other._key)
+
+    def __reduce__(self):
+        return Require, self._key
 
     def __str__(self):
         ret = f"{self.edge_type.name}\n{self.name}/{self.version_expr}"
@@ -68,13 +156,20 @@ class LibraryType(AutoName):
 
 
 class ConanFile:
+    """ Recipe for a name and version (and options). Conanfiles are immutable, the hash is
+        computed once and it is consistent with the equality.
+    """
+    __slots__ = ('name', 'version', 'options', '_hash')
+
     name: str
     version: str
-    options: Dict[str, str] = {}
+    options: Options
 
-    def __init__(self, name, version):
+    def __init__(self, name, version, options: Optional[Dict[str, str]] = None):
         self.name = name
         self.version = version
+        self.options = Options(options)
+        self._hash = hash((name, version, self.options))
 
     def __str__(self):
         if self.options:
@@ -83,11 +178,20 @@ class ConanFile:
             return f"{self.name}/{self.version}"
 
     def __hash__(self):
-        return hash(self.name) ^ hash(self.version)
+        return self._hash
 
     def __eq__(self, other: "ConanFile") -> bool:
-        return self.name == other.name and self.version == other.version \
-               and self.options == other.options
+        if not isinstance(other, ConanFile):
+            return NotImplemented
+        return self is other or (self._hash == other._hash and self.name == other.name
+                                 and self.version == other.version and self.options == other.options)
+
+    def __reduce__(self):
+        # The hash is computed again when unpickled, it is different for every interpreter
+        #  (PYTHONHASHSEED). Subclasses are restored with all their slots.
+        state = {slot: getattr(self, slot) for cls in type(self).__mro__ for slot in getattr(cls, '__slots__', ())
+                 if slot != '_hash' and hasattr(self, slot)}
+        return _unpickle_conanfile, (type(self), state)
 
     def get_type(self) -> LibraryType:
         raise NotImplementedError
@@ -96,6 +200,39 @@ class ConanFile:
         raise NotImplementedError
 
 
+def _unpickle_conanfile(cls, state: Dict) -> ConanFile:
+    conanfile = cls.__new__(cls)
+    for slot, value in state.items():
+        setattr(conanfile, slot, value)
+    conanfile._hash = hash((conanfile.name, conanfile.version, conanfile.options))
+    return conanfile
+
+
 class Provider:
+    # The conanfile returned depends only on the name and the constraints given (not on the
+    #  origin of them or any other state), so it can be cached. Set to False otherwise.
+    pure: bool = True
+
     def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]) -> ConanFile:
         raise NotImplementedError
+
+    def get_conanfiles(self, batch: List[Tuple[str, List[Tuple[str, Require]]]]) -> List[Union[ConanFile, Exception]]:
+        """ Conanfiles for several requests (name and constraints) in a single round-trip. Errors
+            are returned in the position of the request, they are raised only if (and when) the
+            conanfile is actually needed.
+        """
+        conanfiles = []
+        for name, constraints in batch:
+            try:
+                conanfiles.append(self.get_conanfile(name, constraints))
+            except Exception as e:
+                conanfiles.append(e)
+        return conanfiles
+
+
+class AsyncProvider:
+    # Same meaning as 'Provider.pure'
+    pure: bool = True
+
+    async def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]) -> ConanFile:
+        raise NotImplementedError
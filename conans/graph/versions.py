@@ -0,0 +1,191 @@
+"""
+Version ranges: expressions are parsed (and cached) into a union of intervals, the versions
+available for a package are kept sorted in a 'VersionIndex' so the best match for one or
+several ranges (intersected) is found with a binary search.
+
+Supported expressions (optionally enclosed in brackets): an exact version ('1.2.3'),
+comparisons ('>1.0', '>=1.0', '<2.0', '<=2.0', '=1.0'), tilde ('~1.2': '>=1.2 <1.3') and
+caret ('^1.2': '>=1.2 <2'), '*' for any version. Conditions separated by spaces must all
+be satisfied, alternatives are separated by '||'. An exclusive upper bound excludes its
+prereleases too ('<2.0' doesn't match '2.0-beta').
+"""
+import bisect
+import functools
+from typing import List, Optional, Tuple, Iterable
+
+
+@functools.total_ordering
+class Version:
+    """ Version compared by its components: numbers as numbers ('1.10' > '1.9'), a prerelease
+        goes before the release ('1.0-rc1' < '1.0')
+    """
+    __slots__ = ('value', '_key')
+
+    def __init__(self, value: str):
+        self.value = value
+        main, _, prerelease = value.partition('-')
+        components = tuple((0, int(it), '') if it.isdigit() else (1, 0, it) for it in main.split('.'))
+        # A release sorts after any of its prereleases
+        self._key = (components, (1, ()) if not prerelease else (0, tuple(prerelease.split('.'))))
+
+    @classmethod
+    @functools.lru_cache(maxsize=65536)
+    def parse(cls, value: str) -> "Version":
+        return cls(value)
+
+    def bump(self, position: int) -> "Version":
+        """ Version with the component at 'position' incremented (upper bound for '~' and '^') """
+        numbers = [it[1] for it in self._key[0][:position + 1]]
+        numbers += [0] * (position + 1 - len(numbers))
+        numbers[position] += 1
+        return Version.parse(".".join(str(it) for it in numbers))
+
+    def first_prerelease(self) -> "Version":
+        """ Lower than any prerelease of this version, '<2.0' shouldn't match '2.0-beta' """
+        if self._key[1][0] == 0:
+            return self
+        version = Version(f"{self.value}-")
+        version._key = (self._key[0], (0, ()))
+        return version
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Version) and self._key == other._key
+
+    def __lt__(self, other: "Version") -> bool:
+        return self._key < other._key
+
+    def __hash__(self):
+        return hash(self._key)
+
+    def __repr__(self):
+        return f"Version({self.value!r})"
+
+
+# Interval: (lower, lower inclusive, upper, upper inclusive), None for no bound
+Interval = Tuple[Optional[Version], bool, Optional[Version], bool]
+
+
+def _intersect_intervals(a: Interval, b: Interval) -> Optional[Interval]:
+    lower, lower_inclusive = a[0], a[1]
+    if b[0] is not None and (lower is None or b[0] > lower or (b[0] == lower and not b[1])):
+        lower, lower_inclusive = b[0], b[1]
+    upper, upper_inclusive = a[2], a[3]
+    if b[2] is not None and (upper is None or b[2] < upper or (b[2] == upper and not b[3])):
+        upper, upper_inclusive = b[2], b[3]
+    if lower is not None and upper is not None:
+        if lower > upper or (lower == upper and not (lower_inclusive and upper_inclusive)):
+            return None
+    return lower, lower_inclusive, upper, upper_inclusive
+
+
+class VersionRange:
+    """ Union of intervals of versions, use 'VersionRange.parse' (cached) to create them """
+    __slots__ = ('expression', 'intervals')
+
+    def __init__(self, expression: str, intervals: Tuple[Interval, ...]):
+        self.expression = expression
+        self.intervals = intervals
+
+    @classmethod
+    @functools.lru_cache(maxsize=4096)
+    def parse(cls, expression: str) -> "VersionRange":
+        body = expression.strip()
+        if body.startswith('[') and body.endswith(']'):
+            body = body[1:-1]
+        intervals = []
+        for alternative in body.split('||'):
+            interval: Optional[Interval] = (None, True, None, True)
+            for condition in alternative.split():
+                interval = _intersect_intervals(interval, cls._parse_condition(condition))
+                if interval is None:
+                    break
+            if interval is not None:
+                intervals.append(interval)
+        return cls(expression, tuple(intervals))
+
+    @staticmethod
+    def _parse_condition(condition: str) -> Interval:
+        if condition == '*':
+            return None, True, None, True
+        for operator in ('>=', '<=', '>', '<', '=', '~', '^'):
+            if condition.startswith(operator):
+                version = Version.parse(condition[len(operator):])
+                break
+        else:
+            operator, version = '=', Version.parse(condition)
+
+        if operator == '>=':
+            return version, True, None, True
+        elif operator == '>':
+            return version, False, None, True
+        elif operator == '<=':
+            return None, True, version, True
+        elif operator == '<':
+            return None, True, version.first_prerelease(), False
+        elif operator == '~':
+            return version, True, version.bump(1 if len(version._key[0]) > 1 else 0).first_prerelease(), False
+        elif operator == '^':
+            first = next((i for i, it in enumerate(version._key[0]) if it != (0, 0, '')), 0)
+            return version, True, version.bump(first).first_prerelease(), False
+        return version, True, version, True
+
+    def intersection(self, other: "VersionRange") -> "VersionRange":
+        intervals = []
+        for a in self.intervals:
+            for b in other.intervals:
+                interval = _intersect_intervals(a, b)
+                if interval is not None:
+                    intervals.append(interval)
+        return VersionRange(f"{self.expression} && {other.expression}", tuple(intervals))
+
+    def __contains__(self, version: Version) -> bool:
+        for lower, lower_inclusive, upper, upper_inclusive in self.intervals:
+            if lower is not None and (version < lower or (version == lower and not lower_inclusive)):
+                continue
+            if upper is not None and (version > upper or (version == upper and not upper_inclusive)):
+                continue
+            return True
+        return False
+
+    def __repr__(self):
+        return f"VersionRange({self.expression!r})"
+
+
+class VersionIndex:
+    """ Versions available for a package, sorted, to find the best (highest) match for ranges.
+        Prereleases are candidates only if any of the expressions contains a prerelease.
+    """
+
+    def __init__(self, versions: Iterable[str]):
+        parsed = sorted((Version.parse(it), it) for it in versions)
+        releases = [(version, value) for version, value in parsed if version._key[1][0] == 1]
+        # Sorted versions and the original strings, with and without the prereleases
+        self._all: Tuple[List[Version], List[str]] = ([it for it, _ in parsed], [it for _, it in parsed])
+        self._releases: Tuple[List[Version], List[str]] = ([it for it, _ in releases], [it for _, it in releases])
+
+    def __len__(self):
+        return len(self._all[0])
+
+    def best_match(self, *expressions: str) -> Optional[str]:
+        """ Highest version satisfying all the expressions (None if there isn't any) """
+        version_range = VersionRange.parse(expressions[0])
+        for it in expressions[1:]:
+            version_range = version_range.intersection(VersionRange.parse(it))
+        versions, values = self._all if any('-' in it for it in expressions) else self._releases
+
+        best = None
+        for lower, lower_inclusive, upper, upper_inclusive in version_range.intervals:
+            if upper is None:
+                i = len(versions)
+            elif upper_inclusive:
+                i = bisect.bisect_right(versions, upper)
+            else:
+                i = bisect.bisect_left(versions, upper)
+            if not i:
+                continue
+            version = versions[i - 1]
+            if lower is not None and (version < lower or (version == lower and not lower_inclusive)):
+                continue
+            if best is None or version > versions[best]:
+                best = i - 1
+        return None if best is None else values[best]
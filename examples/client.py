@@ -0,0 +1,96 @@
+"""
+Thin client for the resolver service (see 'examples/service.py'). It only uses the standard
+library, so it starts fast: it sends the request and writes the graph received (serialized
+'CompactGraph', load it with 'conans.graph.cache.loads') to a file.
+
+Messages (both ways) are a JSON header, prefixed by its length (4 bytes, big-endian), followed
+by a payload of 'header["size"]' bytes (if any).
+"""
+import json
+import os
+import socket
+import struct
+import sys
+from typing import Dict, Tuple, Optional
+
+DEFAULT_SOCKET = os.path.join(os.environ.get('XDG_RUNTIME_DIR') or '/tmp', 'conan-graph.sock')
+
+_LENGTH = struct.Struct('>I')
+
+
+def _receive_exactly(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise ConnectionError("Connection closed before the end of the message")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def send_message(sock: socket.socket, header: Dict, payload: bytes = b""):
+    data = json.dumps({**header, 'size': len(payload)}).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data + payload)
+
+
+def receive_message(sock: socket.socket) -> Optional[Tuple[Dict, bytes]]:
+    """ Returns the header and the payload, None if the connection is closed before a new message """
+    first = sock.recv(_LENGTH.size)
+    if not first:
+        return None
+    length, = _LENGTH.unpack(first + _receive_exactly(sock, _LENGTH.size - len(first)))
+    header = json.loads(_receive_exactly(sock, length))
+    return header, _receive_exactly(sock, header.get('size', 0))
+
+
+def request(header: Dict, socket_path: str = DEFAULT_SOCKET) -> Tuple[Dict, bytes]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(socket_path)
+        send_message(sock, header)
+        response = receive_message(sock)
+    if response is None:
+        raise ConnectionError("No response from the resolver service")
+    return response
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Conans Graph: client for the resolver service")
+    parser.add_argument("--socket", dest="socket_path", default=DEFAULT_SOCKET,
+                        help=f"socket of the service (default: '{DEFAULT_SOCKET}').")
+    parser.add_argument("-o", "--output", dest="output", default="output.graph",
+                        help="file to write the graph to.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    resolve = commands.add_parser("resolve", help="resolve the graph for an input graph (GraphML file).")
+    resolve.add_argument("graphml", help="input graph (GraphML file).")
+    resolve.add_argument("--root", dest="root", default=None, help="root of the graph (the first one by default).")
+    update = commands.add_parser("update", help="resolve again a graph after modifying some requirements.")
+    update.add_argument("session", help="session returned by a previous request.")
+    update.add_argument("changes", help="JSON file with a list of [origin, target, attributes] (null "
+                                        "attributes to remove the requirement).")
+    commands.add_parser("stats", help="print the metrics of the service.")
+    commands.add_parser("shutdown", help="stop the service.")
+    arguments = parser.parse_args(sys.argv[1:])
+
+    header = {'command': arguments.command}
+    if arguments.command == 'resolve':
+        with open(arguments.graphml) as f:
+            header.update(graphml=f.read(), root=arguments.root)
+    elif arguments.command == 'update':
+        with open(arguments.changes) as f:
+            header.update(session=arguments.session, changes=json.load(f))
+
+    try:
+        response, payload = request(header, arguments.socket_path)
+    except OSError as e:
+        sys.stderr.write(f"Cannot connect to the resolver service at '{arguments.socket_path}': {e}\n")
+        sys.exit(2)
+    response.pop('size', None)
+    if payload:
+        with open(arguments.output, 'wb') as f:
+            f.write(payload)
+        response['output'] = arguments.output
+    sys.stdout.write(f"{json.dumps(response, indent=2)}\n")
+    sys.exit(0 if response.get('status') == 'ok' else 1)
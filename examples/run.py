@@ -1,15 +1,32 @@
 import json
+import logging
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
 
 import networkx as nx
 
 from conans.graph import Graph
-from conans.graph.builders import bfs_builder, BFSBuilderEx1
+from conans.graph.builders import bfs_builder, BFSBuilderEx1, Statistics
+from conans.graph.cache import GraphCache
+from conans.graph.providers import CachingProvider
 from .utils import ProviderExample
 
+log = logging.getLogger(__name__)
+
+
+def main(graphml, jsonfile, jobs=None, stats=False, cache_dir=None):
+    if cache_dir:
+        cache = GraphCache(cache_dir)
+        with open(graphml, 'rb') as f, open(jsonfile, 'rb') as g:
+            key = GraphCache.key(f.read(), g.read())
+        graph = cache.load(key)
+        if graph is not None:
+            log.info(f"Graph loaded from the cache: '{key}'")
+            graph.write_dot("output.dot")
+            os.system("dot -Tpng output.dot -o output.png")
+            return
 
-def main(graphml, jsonfile):
     available_recipes = json.load(open(jsonfile))
     input_graph = nx.read_graphml(graphml)
     nx.drawing.nx_agraph.write_dot(input_graph, "input.dot")
@@ -21,15 +38,25 @@ def main(graphml, jsonfile):
     Build the graph of nodes resolving version ranges and overrides and
     reporting conflicts
     """
-    provider = ProviderExample(input_graph, available_recipes)
-    graph = bfs_builder(root, provider, builder_class=BFSBuilderEx1)
+    provider = CachingProvider(ProviderExample(input_graph, available_recipes))
+    observers = [Statistics()] if stats else None
+    if jobs:
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            graph = bfs_builder(root, provider, builder_class=BFSBuilderEx1, executor=executor,
+                                observers=observers)
+    else:
+        graph = bfs_builder(root, provider, builder_class=BFSBuilderEx1, observers=observers)
+    log.info(f"Provider cache: {provider.hits} hits, {provider.misses} misses")
+    if stats:
+        sys.stdout.write(f"{observers[0].summary()}\n")
+    if cache_dir:
+        cache.save(key, graph)
     Graph.write_dot(graph, "output.dot")
     os.system("dot -Tpng output.dot -o output.png")
 
 
 if __name__ == '__main__':
     import argparse
-    import logging
 
     formatter_class = argparse.RawDescriptionHelpFormatter
     parser = argparse.ArgumentParser(description="Conans Graph: Example 1",
@@ -37,6 +64,12 @@ if __name__ == '__main__':
     parser.add_argument("-v", "--verbose", dest="verbose_count",
                         action="count", default=0,
                         help="increases log verbosity for each occurence.")
+    parser.add_argument("-j", "--jobs", dest="jobs", type=int, default=None,
+                        help="number of threads to build the subgraphs concurrently.")
+    parser.add_argument("--stats", dest="stats", action="store_true", default=False,
+                        help="print the events of the builder (counts and times).")
+    parser.add_argument("--cache", dest="cache_dir", default=None,
+                        help="directory to store the resolved graphs (reused if the inputs don't change).")
     parser.add_argument("example", default=None,
                         help="example to run.")
     arguments = parser.parse_args(sys.argv[1:])
@@ -56,4 +89,4 @@ if __name__ == '__main__':
     sys.stdout.write(f" - GraphML: '{graphml}'\n")
     sys.stdout.write(f" - JSON: '{jsonfile}'\n")
 
-    main(graphml, jsonfile)
+    main(graphml, jsonfile, jobs=arguments.jobs, stats=arguments.stats, cache_dir=arguments.cache_dir)
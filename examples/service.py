@@ -0,0 +1,265 @@
+"""
+Long-running resolver: the recipes available in the server are loaded only once and the state
+used to resolve an input graph (parsed requirements, conanfiles returned by the provider,
+version ranges and subgraphs) is kept between requests. Requests are received through a Unix
+domain socket (see 'examples/client.py' for the protocol and a command line client):
+
+ * 'resolve': input graph (GraphML contents) and optionally the root. The same input resolved
+   before is answered without resolving it again.
+ * 'update': 'session' (returned by a previous request) and 'changes', a list of
+   [origin, target, attributes] for the requirements added or modified (attributes set to
+   None to remove it). Only the vertices affected are resolved again.
+ * 'stats': metrics of the service (cache hit rates, latency of the requests).
+ * 'shutdown'
+
+The finished graph is returned as the payload of the response, serialized like in the
+cache of graphs (see 'conans.graph.cache.dumps').
+"""
+import json
+import logging
+import os
+import socketserver
+import sys
+import threading
+import time
+from collections import OrderedDict, Counter, defaultdict, deque
+from typing import Dict, Tuple, List, Optional, Hashable
+
+import networkx as nx
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder, bfs_update, BFSBuilderEx1
+from conans.graph.cache import GraphCache, dumps
+from conans.graph.providers import CachingProvider
+from conans.graph.versions import Version, VersionRange
+from .client import DEFAULT_SOCKET, send_message, receive_message
+from .utils import ProviderExample
+
+log = logging.getLogger(__name__)
+
+
+class _Session:
+    """ Input graph being resolved and the state that can be reused to resolve it again """
+
+    def __init__(self, input_graph: nx.DiGraph, available_recipes, root: str):
+        self.input_graph = input_graph
+        self.root = root
+        self.recipes = ProviderExample(input_graph, available_recipes)
+        self.provider = CachingProvider(self.recipes, maxsize=None)
+        self.subgraphs: Dict[Hashable, Graph] = {}
+        self.graph: Optional[Graph] = None
+        self.payload = b""
+
+
+class ResolverService:
+    """ Answers the requests (see 'handle'), it can be used without the socket server. Requests
+        that modify the state are serialized, the least recently used sessions are dropped when
+        there are more than 'max_sessions'.
+    """
+
+    def __init__(self, available_recipes, max_sessions: int = 16, latency_samples: int = 1000):
+        self.available_recipes = available_recipes
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.requests = Counter()
+        self.errors = Counter()
+        self.graph_hits = 0
+        self.graph_misses = 0
+        self._latencies: Dict[str, deque] = defaultdict(lambda: deque(maxlen=latency_samples))
+        self._dropped_provider = [0, 0]  # Hits and misses of the providers of dropped sessions
+
+    @classmethod
+    def from_file(cls, jsonfile: str, **kwargs) -> "ResolverService":
+        with open(jsonfile) as f:
+            return cls(json.load(f), **kwargs)
+
+    def handle(self, header: Dict) -> Tuple[Dict, bytes]:
+        """ Returns the header and the payload of the response """
+        command = header.get('command')
+        start = time.perf_counter()
+        try:
+            if command == 'resolve':
+                with self._lock:
+                    response, payload = self._resolve(header['graphml'], header.get('root'))
+            elif command == 'update':
+                with self._lock:
+                    response, payload = self._update(header['session'], header['changes'])
+            elif command == 'stats':
+                response, payload = self.stats(), b""
+            elif command == 'shutdown':
+                response, payload = {}, b""
+            else:
+                raise Exception(f"Unknown command '{command}'")
+            response['status'] = 'ok'
+        except Exception as e:
+            log.exception(f"Request '{command}' failed")
+            self.errors[command] += 1
+            response, payload = {'status': 'error', 'message': f"{type(e).__name__}: {e}"}, b""
+        elapsed = time.perf_counter() - start
+        self.requests[command] += 1
+        self._latencies[command].append(elapsed)
+        log.info("ResolverService::handle(command='%s'): %.3fms", command, elapsed * 1000)
+        response['elapsed_ms'] = elapsed * 1000
+        return response, payload
+
+    def _add_session(self, key: str, session: _Session):
+        self._sessions[key] = session
+        while len(self._sessions) > self.max_sessions:
+            _, dropped = self._sessions.popitem(last=False)
+            self._drop_session(dropped)
+
+    def _drop_session(self, session: _Session):
+        self._dropped_provider[0] += session.provider.hits
+        self._dropped_provider[1] += session.provider.misses
+
+    def _response(self, key: str, session: _Session, cached: bool) -> Tuple[Dict, bytes]:
+        return {'session': key, 'cached': cached, 'root': session.root,
+                'nodes': session.graph.number_of_nodes()}, session.payload
+
+    def _resolve(self, graphml: str, root: Optional[str]) -> Tuple[Dict, bytes]:
+        key = GraphCache.key(graphml, root or "")
+        session = self._sessions.get(key)
+        if session is not None:
+            self.graph_hits += 1
+            self._sessions.move_to_end(key)
+            return self._response(key, session, cached=True)
+
+        self.graph_misses += 1
+        input_graph = nx.parse_graphml(graphml)
+        session = _Session(input_graph, self.available_recipes, root or next(nx.topological_sort(input_graph)))
+        session.graph = bfs_builder(session.root, session.provider, builder_class=BFSBuilderEx1,
+                                    subgraphs=session.subgraphs)
+        session.payload = dumps(session.graph)
+        self._add_session(key, session)
+        return self._response(key, session, cached=False)
+
+    def _update(self, key: str, changes: List) -> Tuple[Dict, bytes]:
+        session = self._sessions.pop(key, None)
+        if session is None:
+            raise Exception(f"Session '{key}' not found (expired?), resolve the input graph again")
+
+        self.graph_misses += 1
+        changed_requires = []
+        try:
+            for origin, target, attributes in changes:
+                if attributes is None:
+                    if session.input_graph.has_edge(origin, target):
+                        session.input_graph.remove_edge(origin, target)
+                else:
+                    if session.input_graph.has_edge(origin, target):
+                        session.input_graph.edges[origin, target].clear()
+                    session.input_graph.add_edge(origin, target, **attributes)
+                changed_requires.append((origin, target))
+            origins = {origin for origin, _ in changed_requires}
+            session.recipes.update(origins)
+            session.provider.invalidate(origins)
+            bfs_update(session.graph, session.provider, changed_requires=changed_requires,
+                       builder_class=BFSBuilderEx1, subgraphs=session.subgraphs)
+            session.payload = dumps(session.graph)
+        except Exception:
+            # The session is not stored again, its state could be inconsistent
+            self._drop_session(session)
+            raise
+
+        key = GraphCache.key(key, json.dumps(changes, sort_keys=True))
+        self._add_session(key, session)
+        return self._response(key, session, cached=False)
+
+    def stats(self) -> Dict:
+        def rate(hits, misses):
+            return hits / (hits + misses) if hits + misses else None
+
+        def latency(samples):
+            ordered = sorted(samples)
+            return {'count': len(ordered), 'mean_ms': 1000 * sum(ordered) / len(ordered),
+                    'p50_ms': 1000 * ordered[len(ordered) // 2],
+                    'p95_ms': 1000 * ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+                    'max_ms': 1000 * ordered[-1]}
+
+        sessions = list(self._sessions.values())
+        provider_hits = self._dropped_provider[0] + sum(it.provider.hits for it in sessions)
+        provider_misses = self._dropped_provider[1] + sum(it.provider.misses for it in sessions)
+        ranges = VersionRange.parse.cache_info()
+        versions = Version.parse.cache_info()
+        return {
+            'requests': dict(self.requests),
+            'errors': dict(self.errors),
+            'sessions': len(sessions),
+            'graphs': {'hits': self.graph_hits, 'misses': self.graph_misses,
+                       'hit_rate': rate(self.graph_hits, self.graph_misses)},
+            'provider': {'hits': provider_hits, 'misses': provider_misses,
+                         'hit_rate': rate(provider_hits, provider_misses)},
+            'ranges': {'hits': ranges.hits, 'misses': ranges.misses, 'hit_rate': rate(ranges.hits, ranges.misses)},
+            'versions': {'hits': versions.hits, 'misses': versions.misses,
+                         'hit_rate': rate(versions.hits, versions.misses)},
+            'subgraphs': sum(len(it.subgraphs) for it in sessions),
+            'latency': {command: latency(samples) for command, samples in self._latencies.items() if samples},
+        }
+
+
+class _RequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # Several requests can be sent through the same connection
+        while True:
+            message = receive_message(self.request)
+            if message is None:
+                return
+            header, _ = message
+            response, payload = self.server.service.handle(header)
+            send_message(self.request, response, payload)
+            if header.get('command') == 'shutdown':
+                # It waits for this handler to return, call it from a different thread
+                threading.Thread(target=self.server.shutdown).start()
+                return
+
+
+class ResolverServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, service: ResolverService):
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)  # Left by a previous instance
+        super().__init__(socket_path, _RequestHandler)
+        self.service = service
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def main(jsonfile: str, socket_path: str, max_sessions: int = 16):
+    service = ResolverService.from_file(jsonfile, max_sessions=max_sessions)
+    with ResolverServer(socket_path, service) as server:
+        log.info(f"Resolver service listening at '{socket_path}'")
+        server.serve_forever()
+    log.info(f"Resolver service stopped: {json.dumps(service.stats())}")
+
+
+if __name__ == '__main__':
+    import argparse
+
+    formatter_class = argparse.RawDescriptionHelpFormatter
+    parser = argparse.ArgumentParser(description="Conans Graph: resolver service",
+                                     formatter_class=formatter_class)
+    parser.add_argument("-v", "--verbose", dest="verbose_count",
+                        action="count", default=0,
+                        help="increases log verbosity for each occurence.")
+    parser.add_argument("--socket", dest="socket_path", default=DEFAULT_SOCKET,
+                        help=f"socket to listen to (default: '{DEFAULT_SOCKET}').")
+    parser.add_argument("--sessions", dest="max_sessions", type=int, default=16,
+                        help="number of input graphs to keep in memory.")
+    parser.add_argument("--server", dest="jsonfile",
+                        default=os.path.join(os.path.dirname(__file__), 'inputs', 'server.json'),
+                        help="JSON file with the recipes available in the server.")
+    arguments = parser.parse_args(sys.argv[1:])
+
+    logging.basicConfig(stream=sys.stderr, level=logging.DEBUG,
+                        format='%(name)s (%(levelname)s): %(message)s')
+    logging.getLogger('conans').setLevel(max(3 - arguments.verbose_count, 0) * 10)
+    logging.getLogger('examples').setLevel(max(2 - arguments.verbose_count, 0) * 10)
+
+    main(os.path.abspath(arguments.jsonfile), arguments.socket_path, max_sessions=arguments.max_sessions)
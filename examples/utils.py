@@ -1,19 +1,24 @@
+import asyncio
 import logging
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional, Iterable
 
 import networkx as nx
 
 from conans.graph.proxy_types import Require, Provider, RequireType, ConanFile, LibraryType, EdgeType, Visibility, \
-    Context
+    Context, AsyncProvider
+from conans.graph.versions import VersionIndex
 
 log = logging.getLogger(__name__)
 
 
 class ConanFileExample(ConanFile):
-    def __init__(self, name, version, graph: nx.DiGraph):
-        super().__init__(name, version)
+    __slots__ = ('_graph', '_requires')
+
+    def __init__(self, name, version, graph: nx.DiGraph, options: Dict[str, str] = None,
+                 requires: Optional[Tuple[Require, ...]] = None):
+        super().__init__(name, version, options)
         self._graph = graph
-        self.name = name
+        self._requires = requires  # Parsed from the graph the first time if not given
 
     @staticmethod
     def _parse_options(options) -> Dict[str, str]:
@@ -24,47 +29,73 @@ class ConanFileExample(ConanFile):
                 ret[key] = value
         return ret
 
-    def _parse_requires(self, name, data) -> Require:
-        options = self._parse_options(data.pop('options', None))
-        require = Require()
-        require.name = name
-        require.options = options
+    @classmethod
+    def _parse_requires(cls, name, data) -> Require:
+        fields = {'options': cls._parse_options(data.pop('options', None))}
         for key in data:
             if key == 'version':
-                require.version_expr = data[key]
+                fields['version_expr'] = data[key]
             elif key == 'edge_type':
-                require.edge_type = EdgeType(data[key])
+                fields['edge_type'] = EdgeType(data[key])
             elif key == 'require_type':
-                require.require_type = RequireType(data[key])
+                fields['require_type'] = RequireType(data[key])
             elif key == 'visibility':
-                require.visibility = Visibility(data[key])
+                fields['visibility'] = Visibility(data[key])
             elif key == 'context':
-                require.context = Context(data[key])
+                fields['context'] = Context(data[key])
             else:
                 raise NotImplementedError(f"Field '{key}' not expected for require")
-        return require
+        return Require.interned(name, **fields)
+
+    @classmethod
+    def compile_requires(cls, graph: nx.DiGraph, names: Optional[Iterable[str]] = None) -> Dict[str, Tuple[Require, ...]]:
+        """ Requirements of the recipes in the graph (all of them or the given ones), parsed in a
+            single pass over the edges
+        """
+        edge_default = graph.graph['edge_default']
+        nodes = graph.nodes if names is None else [it for it in names if it in graph]
+        requires: Dict[str, Tuple[Require, ...]] = {}
+        for name in nodes:
+            requires[name] = tuple(cls._parse_requires(target, {**edge_default, **data})
+                                   for _, target, data in graph.out_edges(name, data=True))
+        return requires
 
     def get_type(self) -> LibraryType:
         return self._graph.nodes[self.name]["library_type"]
 
-    def get_requires(self) -> List[Require]:
-        requires_data = dict()
-        for _, target, data in self._graph.out_edges(self.name, data=True):
-            requires_data[target] = self._graph.graph['edge_default'].copy()
-            requires_data[target].update(data)
-
-        return [self._parse_requires(name=key, data=data) for key, data in requires_data.items()]
+    def get_requires(self) -> Tuple[Require, ...]:
+        if self._requires is None:
+            self._requires = self.compile_requires(self._graph, [self.name]).get(self.name, ())
+        return self._requires
 
 
 class ProviderExample(Provider):
     def __init__(self, g: nx.DiGraph, available_recipes):
         self.graph = g
         self.available_recipes = available_recipes
+        # Requirements of every recipe, parsed only once (see 'update')
+        self.requires = ConanFileExample.compile_requires(g)
+        self._indexes: Dict[str, VersionIndex] = {}  # Versions available, sorted (created on demand)
+
+    def update(self, names: Iterable[str]):
+        """ Parses again the requirements of these recipes (after modifying the input graph), the
+            conanfiles already returned are not modified.
+        """
+        for name in names:
+            self.requires.pop(name, None)
+        self.requires.update(ConanFileExample.compile_requires(self.graph, names))
+
+    def _index(self, name: str) -> VersionIndex:
+        index = self._indexes.get(name)
+        if index is None:
+            index = self._indexes[name] = VersionIndex(it for it in self.available_recipes[name] if it is not None)
+        return index
 
     def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]) -> ConanFileExample:
-        log.debug(f"ProviderExample::get_conanfile(name='{name}', constraints ({len(constraints)}))")
-        for ori, req in constraints:
-            log.debug(f" - {req.edge_type.name}: {ori} -> {req.name}/{req.version_expr}")
+        if log.isEnabledFor(logging.DEBUG):
+            log.debug("ProviderExample::get_conanfile(name='%s', constraints (%s))", name, len(constraints))
+            for ori, req in constraints:
+                log.debug(" - %s: %s -> %s/%s", req.edge_type.name, ori, req.name, req.version_expr)
 
         versions_available = self.available_recipes[name]
         version_selected = None
@@ -89,7 +120,51 @@ class ProviderExample(Provider):
                 if not overriden:
                     version_selected = require.version_expr
 
-        assert version_selected in versions_available, f"{version_selected} not found in {versions_available}"
-        conanfile = ConanFileExample(name=name, version=version_selected, graph=self.graph)
-        conanfile.options = options
-        return conanfile
+        if version_selected is None:  # The root
+            assert None in versions_available, f"{version_selected} not found in {versions_available}"
+        else:
+            version = self._index(name).best_match(version_selected)
+            assert version is not None, f"{version_selected} not found in {versions_available}"
+            version_selected = version
+        return ConanFileExample(name=name, version=version_selected, graph=self.graph, options=options,
+                                requires=self.requires.get(name, ()))
+
+
+class CountingProvider(ProviderExample):
+    """ Counts the conanfiles requested and the round-trips (calls to 'get_conanfile' or to
+        'get_conanfiles' with a batch of requests)
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = 0
+        self.round_trips = 0
+        self._in_batch = False
+
+    def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]):
+        self.calls += 1
+        if not self._in_batch:
+            self.round_trips += 1
+        return super().get_conanfile(name, constraints)
+
+    def get_conanfiles(self, batch: List[Tuple[str, List[Tuple[str, Require]]]]):
+        self.round_trips += 1
+        self._in_batch = True
+        try:
+            return super().get_conanfiles(batch)
+        finally:
+            self._in_batch = False
+
+
+class AsyncProviderExample(AsyncProvider):
+    """ Stand-in for a remote provider: answers like the given provider after some latency """
+    def __init__(self, provider: Provider, latency: float = 0.01):
+        self.provider = provider
+        self.latency = latency
+
+    @property
+    def pure(self) -> bool:
+        return self.provider.pure
+
+    async def get_conanfile(self, name: str, constraints: List[Tuple[str, Require]]) -> ConanFile:
+        await asyncio.sleep(self.latency)
+        return self.provider.get_conanfile(name, constraints)
@@ -0,0 +1,49 @@
+import unittest
+
+from conans.graph.builders import bfs_builder
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class AmbiguityTestCase(unittest.TestCase):
+
+    def test_unordered_requirers_same_constraints(self):
+        # Many independent siblings requiring the same library: no need to check every order
+        edges = [('root', f'lib{i}', {'version': '1.0'}) for i in range(12)]
+        edges += [(f'lib{i}', 'common', {'version': '1.0'}) for i in range(12)]
+        g = input_graph(edges)
+        provider = CountingProvider(g, available_recipes(g))
+        graph = bfs_builder('root', provider)
+        self.assertEqual(graph.nodes['common']['conanfile'].version, '1.0')
+        self.assertEqual(provider.calls, 14)
+
+    def test_unordered_requirers_conflict(self):
+        g = input_graph([('root', 'lib1', {'version': '1.0'}),
+                         ('root', 'lib2', {'version': '1.0'}),
+                         ('lib1', 'common', {'version': '1.0'}),
+                         ('lib2', 'common', {'version': '2.0'})])
+        provider = CountingProvider(g, available_recipes(g))
+        with self.assertRaisesRegex(AssertionError, "Multiple conanfiles --> ambiguity!") as cm:
+            bfs_builder('root', provider)
+        self.assertIn("'lib1' and 'lib2'", str(cm.exception))
+
+    def test_unordered_requirers_conflict_three(self):
+        # No pair of requirers swapped at the front changes the result, but 'lib1' last does
+        g = input_graph([('root', 'lib1', {'version': '1.0'}),
+                         ('root', 'lib2', {'version': '1.0'}),
+                         ('root', 'lib3', {'version': '1.0'}),
+                         ('lib1', 'common', {'version': '1.0'}),
+                         ('lib2', 'common', {'version': '2.0'}),
+                         ('lib3', 'common', {'version': '2.0'})])
+        provider = CountingProvider(g, available_recipes(g))
+        with self.assertRaisesRegex(AssertionError, "Multiple conanfiles --> ambiguity!") as cm:
+            bfs_builder('root', provider)
+        self.assertIn("'lib1' and 'lib3'", str(cm.exception))
+
+    def test_ordered_requirers(self):
+        # 'root' is an ancestor of 'lib1', so its override takes precedence
+        g = input_graph([('root', 'lib1', {'version': '1.0'}),
+                         ('root', 'common', {'version': '3.0', 'edge_type': 'override'}),
+                         ('lib1', 'common', {'version': '1.0'})])
+        provider = CountingProvider(g, available_recipes(g))
+        graph = bfs_builder('root', provider)
+        self.assertEqual(graph.nodes['common']['conanfile'].version, '3.0')
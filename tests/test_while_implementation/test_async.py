@@ -0,0 +1,52 @@
+import asyncio
+import unittest
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder, async_bfs_builder
+from examples.utils import AsyncProviderExample
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class ConcurrencyProvider(AsyncProviderExample):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.running = 0
+        self.max_running = 0
+
+    async def get_conanfile(self, *args, **kwargs):
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            return await super().get_conanfile(*args, **kwargs)
+        finally:
+            self.running -= 1
+
+
+class AsyncBuilderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        edges = [('root', f'lib{i}', {'version': '1.0'}) for i in range(20)]
+        edges += [(f'lib{i}', f'dep{i % 5}', {'version': '1.0'}) for i in range(20)]
+        edges += [('lib0', 'cmake', {'version': '1.0', 'context': 'other'})]
+        self.g = input_graph(edges)
+
+    def test_same_graph(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        serial = bfs_builder('root', provider)
+
+        async_provider = ConcurrencyProvider(CountingProvider(self.g, available_recipes(self.g)), latency=0.01)
+        graph = asyncio.run(async_bfs_builder('root', async_provider, max_concurrency=4))
+
+        printable_serial = Graph.printable_graph(serial)
+        printable = Graph.printable_graph(graph)
+        self.assertListEqual(list(printable_serial.nodes(data=True)), list(printable.nodes(data=True)))
+        self.assertListEqual(list(printable_serial.edges(data=True)), list(printable.edges(data=True)))
+        self.assertEqual(async_provider.provider.calls, provider.calls)
+        self.assertEqual(async_provider.max_running, 4)
+
+    def test_error(self):
+        g = input_graph([('root', 'lib1', {'version': '1.0'}),
+                         ('root', 'lib2', {'version': '5.0'})])
+        async_provider = AsyncProviderExample(CountingProvider(g, available_recipes(g)), latency=0)
+        with self.assertRaisesRegex(AssertionError, "5.0 not found"):
+            asyncio.run(async_bfs_builder('root', async_provider))
@@ -0,0 +1,91 @@
+import unittest
+
+from benchmarks.generators import random_graph
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder, bfs_multi_builder, BatchedBFSBuilder, Statistics
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class BatchingProvider(CountingProvider):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def get_conanfiles(self, batch):
+        self.batches.append(len(batch))
+        return super().get_conanfiles(batch)
+
+
+def _printable(g):
+    p = Graph.printable_graph(g)
+    return sorted(p.nodes(data=True)), sorted((u, v, sorted(d.items())) for u, v, d in p.edges(data=True))
+
+
+class BatchedBuilderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        edges = [('root', f'lib{i}', {'version': '1.0'}) for i in range(10)]
+        edges += [(f'lib{i}', f'dep{i % 3}', {'version': '1.0'}) for i in range(10)]
+        edges += [('lib9', 'dep0', {'version': '2.0', 'edge_type': 'override'}),
+                  ('lib0', 'cmake', {'version': '1.0', 'context': 'other'})]
+        self.g = input_graph(edges)
+
+    def test_batched(self):
+        expected = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)))
+        provider = BatchingProvider(self.g, available_recipes(self.g))
+        stats = Statistics()
+        graph = bfs_builder('root', provider, builder_class=BatchedBFSBuilder, observers=[stats])
+        self.assertEqual(_printable(graph), _printable(expected))
+
+        # One batch per level: root, libs and deps ('cmake' subgraph has only the root)
+        self.assertListEqual(provider.batches, [1, 10, 3])
+        self.assertEqual(stats.counts['provider_batch'], 3)
+        self.assertEqual(stats.counts['provider'], 1)  # The root of the subgraph
+        self.assertEqual(provider.calls, 1 + 10 + 3 + 1)
+
+    def test_errors(self):
+        # Errors are raised only if the conanfile is actually needed
+        provider = BatchingProvider(self.g, available_recipes(self.g))
+        provider.available_recipes['dep1'] = ['2.0']
+        with self.assertRaisesRegex(AssertionError, r"1.0 not found in \['2.0'\]"):
+            bfs_builder('root', provider, builder_class=BatchedBFSBuilder)
+
+    def test_random_graphs(self):
+        # Same result (or the same error) as BFSBuilderEx1
+        for seed in range(200):
+            g, recipes = random_graph(3 + seed % 12, seed=seed)
+            with self.subTest(seed=seed):
+                try:
+                    expected = _printable(bfs_builder('root', CountingProvider(g, recipes)))
+                except Exception as e:
+                    expected = f"{type(e).__name__}: {e}"
+                try:
+                    graph = _printable(bfs_builder('root', CountingProvider(g, recipes),
+                                                   builder_class=BatchedBFSBuilder))
+                except Exception as e:
+                    graph = f"{type(e).__name__}: {e}"
+                self.assertEqual(graph, expected)
+
+
+class MultiRootTestCase(unittest.TestCase):
+
+    def test_shared(self):
+        edges = [(f'app{i}', f'lib{j}', {'version': '1.0'}) for i in range(5) for j in range(5)]
+        edges += [(f'lib{j}', 'zlib', {'version': '1.0'}) for j in range(5)]
+        edges += [(f'lib{j}', 'cmake', {'version': '1.0', 'context': 'other'}) for j in range(5)]
+        g = input_graph(edges)
+        recipes = available_recipes(g)
+        recipes.update({f'app{i}': [None] for i in range(5)})
+        roots = [f'app{i}' for i in range(5)]
+
+        provider = CountingProvider(g, recipes)
+        graphs = bfs_multi_builder(roots, provider)
+        self.assertListEqual(list(graphs), roots)
+        self.assertEqual(provider.calls, 5 + 5 + 1 + 1)  # Roots, libs, zlib and the 'cmake' subgraph
+        cmake = {id(sg) for graph in graphs.values() for subgraphs in graph.get_subgraphs().values()
+                 for sg, _ in subgraphs}
+        self.assertEqual(len(cmake), 1)
+
+        for root in roots:
+            expected = bfs_builder(root, CountingProvider(g, recipes))
+            self.assertEqual(_printable(graphs[root]), _printable(expected))
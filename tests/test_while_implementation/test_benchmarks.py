@@ -0,0 +1,31 @@
+import unittest
+
+from benchmarks.generators import GENERATORS
+from benchmarks.run import run_case, run_versions, run_multi_root
+
+
+class BenchmarksTestCase(unittest.TestCase):
+
+    def test_shapes(self):
+        for shape in GENERATORS:
+            result = run_case(shape, 30, memory=True)
+            self.assertGreater(result['provider_calls'], 0)
+            self.assertGreater(result['peak_memory_kb'], 0)
+            self.assertGreaterEqual(result['printable_nodes'], result['nodes'])
+
+    def test_chain_memory(self):
+        # Memory grows linearly with the length of the chain (caching the ancestors of every
+        #  node would make it quadratic)
+        small = run_case('chain', 250, memory=True)
+        large = run_case('chain', 1000, memory=True)
+        self.assertLess(large['peak_memory_kb'], 6 * small['peak_memory_kb'])
+
+    def test_versions(self):
+        result = run_versions(2000, queries=20)
+        self.assertEqual(result['versions'], 2000)
+        self.assertGreater(result['linear_query_us'], 0)
+
+    def test_multi_root(self):
+        result = run_multi_root(4, size=30)
+        self.assertEqual(result['separate_provider_calls'], 4 * 30)
+        self.assertEqual(result['multi_provider_calls'], 4 + 29)  # Libraries resolved only once
@@ -0,0 +1,24 @@
+import unittest
+
+from conans.graph.builders.bfs import WorkQueue
+
+
+class WorkQueueTestCase(unittest.TestCase):
+
+    def test_fifo(self):
+        queue = WorkQueue()
+        for it in ['a', 'b', 'c', 'd']:
+            queue.append(it)
+        self.assertEqual(len(queue), 4)
+        self.assertEqual(queue.popleft(), 'a')
+        self.assertNotIn('a', queue)
+        self.assertIn('b', queue)
+
+        queue.discard(['b', 'd', 'not-in-queue'])
+        self.assertEqual(len(queue), 1)
+        queue.append('b')  # Goes to the back, the stale entry is ignored
+        self.assertEqual(queue.popleft(), 'c')
+        self.assertEqual(queue.popleft(), 'b')
+        self.assertFalse(queue)
+        with self.assertRaises(IndexError):
+            queue.popleft()
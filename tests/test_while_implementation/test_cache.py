@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder
+from conans.graph.cache import GraphCache
+from conans.graph.proxy_types import ConanFile
+from tests.utils import input_graph, CountingProvider, available_recipes, run_in_subprocess
+
+
+class GraphCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        edges = self.edges = [('root', 'libA', {'version': '1.0'}),
+                              ('root', 'libB', {'version': '1.0', 'options': 'shared=True'}),
+                              ('libA', 'zlib', {'version': '1.0'}), ('libB', 'zlib', {'version': '1.0'}),
+                              ('libA', 'cmake', {'version': '1.0', 'context': 'other'}),
+                              ('libB', 'cmake', {'version': '1.0', 'context': 'other'})]
+        g = input_graph(edges)
+        self.graph = bfs_builder('root', CountingProvider(g, available_recipes(g)))
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_save_load(self):
+        cache = GraphCache(self.tmp.name)
+        key = GraphCache.key('input', b'server')
+        self.assertNotIn(key, cache)
+        self.assertIsNone(cache.load(key))
+
+        cache.save(key, self.graph)
+        self.assertIn(key, cache)
+        compact = cache.load(key)
+        self.assertIs(type(compact.conanfile('libB')), ConanFile)  # Recipes are not stored
+        self.assertEqual(compact.conanfile('libB'), self.graph.nodes['libB']['conanfile'])
+
+        (cmake_a, _), = compact.subgraphs('libA')
+        (cmake_b, _), = compact.subgraphs('libB')
+        self.assertIs(cmake_a, cmake_b)
+
+        def printable(g):
+            p = Graph.printable_graph(g)
+            return list(p.nodes(data=True)), list(p.edges(data=True))
+
+        self.assertEqual(printable(compact.to_networkx()), printable(self.graph))
+
+    def test_key(self):
+        self.assertEqual(GraphCache.key('a', 'b'), GraphCache.key(b'a', b'b'))
+        self.assertNotEqual(GraphCache.key('a', 'b'), GraphCache.key('ab'))
+        self.assertNotEqual(GraphCache.key('a', 'b'), GraphCache.key('b', 'a'))
+
+    def test_corrupted(self):
+        cache = GraphCache(self.tmp.name)
+        key = GraphCache.key('input')
+        cache.save(key, self.graph)
+        with open(os.path.join(self.tmp.name, f"{key}.graph"), 'wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(cache.load(key))
+        self.assertListEqual(os.listdir(self.tmp.name), [f"{key}.graph"])
+
+    def test_other_process(self):
+        # Graph stored by a different interpreter (different hash seed), loaded and stored again
+        #  there (conanfiles are plain 'ConanFile' records the second time)
+        run_in_subprocess("import sys\n"
+                          "from conans.graph.builders import bfs_builder\n"
+                          "from conans.graph.cache import GraphCache\n"
+                          "from tests.utils import input_graph, CountingProvider, available_recipes\n"
+                          f"g = input_graph({self.edges!r})\n"
+                          "graph = bfs_builder('root', CountingProvider(g, available_recipes(g)))\n"
+                          f"cache = GraphCache({self.tmp.name!r})\n"
+                          "cache.save('first', graph)\n"
+                          "cache.save('key', cache.load('first'))\n")
+        compact = GraphCache(self.tmp.name).load('key')
+        for node, conanfile in self.graph.nodes(data='conanfile'):
+            self.assertEqual(compact.conanfile(node), conanfile)
+            self.assertEqual(hash(compact.conanfile(node)), hash(conanfile))
+        (cmake, _), = compact.subgraphs('libA')
+        (expected, _), = self.graph.get_subgraphs()['libA']
+        self.assertEqual(cmake.conanfile('cmake'), expected.nodes['cmake']['conanfile'])
@@ -0,0 +1,49 @@
+import unittest
+
+from conans.graph import Graph, CompactGraph
+from conans.graph.builders import bfs_builder
+from conans.graph.proxy_types import EdgeType
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class CompactGraphTestCase(unittest.TestCase):
+
+    def setUp(self):
+        edges = [('root', 'libA', {'version': '1.0'}), ('root', 'libB', {'version': '1.0'}),
+                 ('libA', 'zlib', {'version': '1.0'}), ('libB', 'zlib', {'version': '1.0'}),
+                 ('root', 'zlib', {'version': '2.0', 'edge_type': 'override'}),
+                 ('libA', 'cmake', {'version': '1.0', 'context': 'other'}),
+                 ('libB', 'cmake', {'version': '1.0', 'context': 'other'}),
+                 ('cmake', 'openssl', {'version': '1.0'})]
+        g = input_graph(edges)
+        self.graph = bfs_builder('root', CountingProvider(g, available_recipes(g)))
+
+    def test_adjacency(self):
+        compact = self.graph.compact()
+        self.assertIsInstance(compact, CompactGraph)
+        self.assertEqual(len(compact), len(self.graph))
+        self.assertEqual(compact.number_of_edges(), self.graph.number_of_edges())
+        self.assertListEqual(compact.successors('root'), ['libA', 'libB'])
+        self.assertListEqual(compact.successors('root', EdgeType.override), ['zlib'])
+        self.assertListEqual(compact.predecessors('zlib'), ['libA', 'libB'])
+        self.assertEqual(compact.conanfile('zlib').version, '2.0')
+        self.assertTrue(compact.is_enabled('zlib'))
+        self.assertListEqual(compact.topological_order(), ['zlib', 'libA', 'libB', 'root'])
+
+        offsets, targets, _ = compact.adjacency(reverse=True)
+        i = compact.node_id('zlib')
+        self.assertEqual(len(targets[offsets[i]:offsets[i + 1]]), 2)
+
+    def test_subgraphs(self):
+        compact = self.graph.compact()
+        (cmake_a, _), = compact.subgraphs('libA')
+        (cmake_b, _), = compact.subgraphs('libB')
+        self.assertIs(cmake_a, cmake_b)  # Still shared
+        self.assertListEqual(cmake_a.successors('cmake'), ['openssl'])
+
+    def test_to_networkx(self):
+        def printable(g):
+            p = Graph.printable_graph(g)
+            return list(p.nodes(data=True)), list(p.edges(data=True))
+
+        self.assertEqual(printable(self.graph), printable(self.graph.compact().to_networkx()))
@@ -0,0 +1,63 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder
+from conans.graph.export import write_jsonl
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class ExportTestCase(unittest.TestCase):
+
+    def setUp(self):
+        edges = [('root', 'libA', {'version': '1.0'}), ('root', 'libB', {'version': '1.0'}),
+                 ('root', 'zlib', {'version': '2.0', 'edge_type': 'override'}),
+                 ('root', 'bzip2', {'version': '1.0', 'edge_type': 'override'}),
+                 ('libA', 'zlib', {'version': '1.0'}),
+                 ('libA', 'cmake', {'version': '1.0', 'context': 'other'}),
+                 ('libB', 'cmake', {'version': '1.0', 'context': 'other'}),
+                 ('cmake', 'openssl', {'version': '1.0'})]
+        g = input_graph(edges)
+        self.graph = bfs_builder('root', CountingProvider(g, available_recipes(g)))
+
+    def _jsonl(self, **kwargs):
+        stream = io.StringIO()
+        write_jsonl(self.graph, stream, **kwargs)
+        return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+    def test_jsonl(self):
+        records = self._jsonl()
+        printable = Graph.printable_graph(self.graph)
+        nodes = {r['id']: r.get('label') for r in records if r['type'] == 'node'}
+        self.assertDictEqual(nodes, {n: label for n, label in printable.nodes(data='label')})
+        edges = {(r['source'], r['target']): r['label'] for r in records if r['type'] == 'edge'}
+        self.assertDictEqual(edges, {(u, v): label for u, v, label in printable.edges(data='label')})
+        self.assertIn({'type': 'node', 'id': 'bzip2', 'enabled': False}, records)
+
+    def test_collapse_subgraphs(self):
+        records = self._jsonl(collapse_subgraphs=True)
+        nodes = [r['id'] for r in records if r['type'] == 'node']
+        self.assertIn('libA::cmake', nodes)
+        self.assertNotIn('libB::cmake', nodes)
+        links = [(r['source'], r['target']) for r in records if r['type'] == 'edge' and r['subgraph']]
+        self.assertListEqual(links, [('libA', 'libA::cmake'), ('libB', 'libA::cmake')])
+
+    def test_skip_disabled(self):
+        records = self._jsonl(skip_disabled=True)
+        self.assertNotIn('bzip2', [r['id'] for r in records if r['type'] == 'node'])
+        self.assertTrue(all(r['enabled'] for r in records))
+
+    def test_write_dot(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = os.path.join(tmp, 'output.dot')
+            Graph.write_dot(self.graph, output)
+            with open(output) as f:
+                lines = f.read().splitlines()
+        self.assertEqual(lines[0], 'strict digraph {')
+        self.assertIn('"libA::cmake" [label="libA::cmake/1.0"];', lines)
+        self.assertIn('"root" -> "bzip2" [style="dotted", color="black", '
+                      'label="override\\nbzip2/1.0"];', lines)
+        self.assertEqual(lines[-1], '}')
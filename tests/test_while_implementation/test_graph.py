@@ -0,0 +1,136 @@
+import random
+import unittest
+
+import networkx as nx
+
+from conans.graph import Graph
+from conans.graph.proxy_types import Require, EdgeType
+
+
+def _require(name, edge_type=EdgeType.topological):
+    return Require(name, edge_type=edge_type)
+
+
+class RequiresGraphTestCase(unittest.TestCase):
+
+    def _check_requires_graph(self, g: Graph):
+        expected = g.edge_subgraph([(u, v) for u, v, r in g.edges(data='require')
+                                    if r.edge_type == EdgeType.topological])
+        requires_graph = g.get_requires_graph()
+        self.assertSetEqual(set(requires_graph.nodes), set(expected.nodes))
+        self.assertSetEqual(set(requires_graph.edges), set(expected.edges))
+        for n in requires_graph.nodes:
+            ancestors = nx.ancestors(expected, n)
+            self.assertSetEqual(g.requires_ancestors(n), ancestors)
+            candidates = set(list(g.nodes)[::2])
+            self.assertSetEqual(g.requires_ancestors(n, candidates), ancestors & candidates)
+
+    def test_incremental(self):
+        g = Graph()
+        g.add_edge('root', 'lib1', require=_require('lib1'))
+        g.add_edge('root', 'lib2', require=_require('lib2'))
+        g.add_edge('lib1', 'lib3', require=_require('lib3'))
+        g.add_edge('root', 'lib4', require=_require('lib4', EdgeType.override))
+        self._check_requires_graph(g)
+        self.assertSetEqual(g.requires_ancestors('lib3'), {'root', 'lib1'})
+        self.assertNotIn('lib4', g.get_requires_graph())
+
+        # New edge upstream adds ancestors to the branch
+        g.add_edge('lib2', 'lib1', require=_require('lib1'))
+        self.assertSetEqual(g.requires_ancestors('lib3'), {'root', 'lib1', 'lib2'})
+        self._check_requires_graph(g)
+
+        # Changing the type of the edge
+        g.add_edge('root', 'lib4', require=_require('lib4'))
+        g.add_edge('lib2', 'lib1', require=_require('lib1', EdgeType.override))
+        self.assertSetEqual(g.requires_ancestors('lib3'), {'root', 'lib1'})
+        self._check_requires_graph(g)
+
+        self.assertSetEqual(g.requires_ancestors('lib3', ['lib1', 'lib2', 'lib3', 'lib4']), {'lib1'})
+        self.assertSetEqual(g.requires_ancestors('lib4', ['lib3', 'other']), set())
+
+        g.remove_nodes_from(['lib1'])
+        self.assertNotIn('lib3', g.get_requires_graph())
+        self._check_requires_graph(g)
+        g.remove_edge('root', 'lib2')
+        self.assertNotIn('lib2', g.get_requires_graph())
+        self._check_requires_graph(g)
+
+
+class TopologicalOrderTestCase(unittest.TestCase):
+
+    def _check_order(self, g: Graph):
+        requires_graph = g.get_requires_graph()
+        order = g.topological_order()
+        self.assertSetEqual(set(order), set(requires_graph.nodes))
+        for u, v in requires_graph.edges:
+            self.assertLess(g.requires_position(u), g.requires_position(v))
+
+    def test_incremental(self):
+        rnd = random.Random(42)
+        g = Graph()
+        names = [f'lib{i}' for i in range(30)]
+        # Edges are added in random order, only from a lower index to a higher one (no cycles)
+        edges = [(u, v) for i, u in enumerate(names) for v in names[i + 1:] if rnd.random() < 0.2]
+        rnd.shuffle(edges)
+        for u, v in edges:
+            g.add_edge(u, v, require=_require(v))
+            self._check_order(g)
+
+        g.remove_nodes_from(names[10:15])
+        self._check_order(g)
+        g.add_edge(names[29], 'other', require=_require('other'))
+        g.add_edge('other', names[1], require=_require(names[1], EdgeType.override))
+        self._check_order(g)
+
+    def test_add_edges_from(self):
+        # Attributes of each edge take precedence over the common ones (like networkx)
+        g = Graph()
+        g.add_edges_from([('root', 'lib1', {'require': _require('lib1')}), ('root', 'lib2')],
+                         require=_require('lib2', EdgeType.override))
+        self.assertEqual(g.edges['root', 'lib1']['require'].edge_type, EdgeType.topological)
+        self.assertEqual(g.edges['root', 'lib2']['require'].edge_type, EdgeType.override)
+        self.assertListEqual(g.topological_order(), ['root', 'lib1'])
+
+    def test_cycle(self):
+        g = Graph()
+        g.add_edge('root', 'lib1', require=_require('lib1'))
+        g.add_edge('lib1', 'lib2', require=_require('lib2'))
+        g.add_edge('lib2', 'lib3', require=_require('lib3'))
+        g.add_edge('lib3', 'lib1', require=_require('lib1', EdgeType.override))  # Not a requirement
+        with self.assertRaisesRegex(Exception, "There is cycle involving 'lib1' and 'lib3': "
+                                               "lib3 -> lib1 -> lib2 -> lib3"):
+            g.add_edge('lib3', 'lib1', require=_require('lib1'))
+        # The graph is not modified
+        self.assertEqual(g.edges['lib3', 'lib1']['require'].edge_type, EdgeType.override)
+        self.assertListEqual(g.topological_order(), ['root', 'lib1', 'lib2', 'lib3'])
+        with self.assertRaisesRegex(Exception, "There is cycle involving 'lib2' and 'lib2'"):
+            g.add_edge('lib2', 'lib2', require=_require('lib2'))
+        self.assertFalse(g.has_edge('lib2', 'lib2'))
+
+
+class FinishGraphTestCase(unittest.TestCase):
+
+    def test_overrides(self):
+        g = Graph()
+        for i in range(20):
+            g.add_edge(f'lib{i}', f'lib{i + 1}', require=_require(f'lib{i + 1}'))
+            g.add_edge('root', f'lib{i}', require=_require(f'lib{i}'))
+        # Overrides from several nodes to the same targets, some of them not reachable
+        for i in range(0, 20, 4):
+            for j in range(0, 21, 3):
+                if not g.has_edge(f'lib{i}', f'lib{j}'):
+                    g.add_edge(f'lib{i}', f'lib{j}', require=_require(f'lib{j}', EdgeType.override))
+        g.finish_graph()
+
+        requires_graph = g.get_requires_graph()
+        overrides = {}
+        for u, v, require in g.edges(data='require'):
+            if require.edge_type == EdgeType.override and nx.has_path(requires_graph, u, v):
+                overrides.setdefault(v, []).append((nx.shortest_path_length(requires_graph, u, v), u))
+            elif require.edge_type == EdgeType.override:
+                self.assertFalse(g.edges[u, v]['enabled'])
+        for v, ori_requires in overrides.items():
+            enabled = [u for _, u in ori_requires if g.edges[u, v].get('enabled', True)]
+            farthest = sorted(ori_requires, key=lambda x: x[0], reverse=True)[0][1]
+            self.assertListEqual(enabled, [farthest])
@@ -0,0 +1,127 @@
+import random
+import unittest
+
+from benchmarks.generators import random_graph
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder, bfs_update
+from examples.utils import ConanFileExample
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class LatestProvider(CountingProvider):
+    """ Packages in 'latest' resolve to that version, no matter the constraints """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.latest = {}
+
+    def get_conanfile(self, name, constraints):
+        conanfile = super().get_conanfile(name, constraints)
+        if name in self.latest:
+            return ConanFileExample(name, self.latest[name], self.graph, options=conanfile.options)
+        return conanfile
+
+
+class IncrementalTestCase(unittest.TestCase):
+
+    def setUp(self):
+        edges = [('root', 'app', {'version': '1.0'}), ('root', 'libA', {'version': '1.0'}),
+                 ('app', 'libA', {'version': '1.0'}), ('app', 'libB', {'version': '1.0'}),
+                 ('libA', 'zlib', {'version': '1.0'}), ('libB', 'openssl', {'version': '1.0'}),
+                 ('libB', 'cmake', {'version': '1.0', 'context': 'other'}),
+                 ('cmake', 'zlib', {'version': '1.0'})]
+        self.g = input_graph(edges)
+
+    def _check_equal(self, graph, expected):
+        def printable(g):
+            p = Graph.printable_graph(g)
+            return sorted(p.nodes(data=True)), sorted((u, v, sorted(d.items())) for u, v, d in p.edges(data=True))
+
+        self.assertEqual(printable(graph), printable(expected))
+
+    def test_changed_require(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        graph = bfs_builder('root', provider)
+
+        self.g.edges['libA', 'zlib']['version'] = '2.0'
+        self.g.add_edge('libA', 'bzip2', version='1.0')
+        provider.available_recipes['bzip2'] = ['1.0']
+        provider.update(['libA'])
+        provider.calls = 0
+        graph = bfs_update(graph, provider, changed_requires=[('libA', 'zlib'), ('libA', 'bzip2')])
+        self.assertEqual(graph.nodes['zlib']['conanfile'].version, '2.0')
+        self.assertEqual(provider.calls, 3)  # Only 'libA' and its requirements
+
+        expected = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)))
+        self._check_equal(graph, expected)
+
+    def test_changed_package(self):
+        provider = LatestProvider(self.g, available_recipes(self.g))
+        graph = bfs_builder('root', provider)
+        cmake = graph.get_subgraphs()['libB'][0][0]
+
+        # 'zlib' belongs to the graph and to the 'cmake' subgraph
+        provider.latest['zlib'] = '3.0'
+        graph = bfs_update(graph, provider, changed_packages=['zlib'])
+        self.assertEqual(graph.nodes['zlib']['conanfile'].version, '3.0')
+        new_cmake = graph.get_subgraphs()['libB'][0][0]
+        self.assertIsNot(new_cmake, cmake)
+        self.assertEqual(new_cmake.nodes['zlib']['conanfile'].version, '3.0')
+
+        expected_provider = LatestProvider(self.g, available_recipes(self.g))
+        expected_provider.latest['zlib'] = '3.0'
+        self._check_equal(graph, bfs_builder('root', expected_provider))
+
+    def test_removed_require(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        graph = bfs_builder('root', provider)
+
+        self.g.remove_edge('libB', 'openssl')
+        provider.update(['libB'])
+        graph = bfs_update(graph, provider, changed_requires=[('libB', 'openssl')])
+        self.assertNotIn('openssl', graph)
+        self._check_equal(graph, bfs_builder('root', CountingProvider(self.g, available_recipes(self.g))))
+
+    def test_random_changes(self):
+        # Updating the graph gives the same result as building it again (or both fail)
+        for seed in range(150):
+            rnd = random.Random(seed)
+            g, recipes = random_graph(rnd.randint(3, 12), seed=seed)
+            provider = LatestProvider(g, recipes)
+            try:
+                graph = bfs_builder('root', provider)
+            except Exception:
+                continue
+
+            changed_packages, changed_requires = [], []
+            for _ in range(rnd.randint(1, 3)):
+                u, v, data = rnd.choice(list(g.edges(data=True)))
+                r = rnd.random()
+                if r < 0.2:
+                    provider.latest[v] = '3.0'
+                    changed_packages.append(v)
+                    continue
+                elif r < 0.5:
+                    data['version'] = '2.0' if data['version'] == '1.0' else '1.0'
+                elif r < 0.6:
+                    g.remove_edge(u, v)
+                elif r < 0.75:
+                    data['options'] = None if data.get('options') else f"o{rnd.randint(0, 2)}=1"
+                elif r < 0.9:
+                    data['edge_type'] = 'topological' if data.get('edge_type') == 'override' else 'override'
+                else:
+                    u, v = 'root', rnd.choice(list(g.nodes)[1:])
+                    g.add_edge(u, v, version=rnd.choice(['1.0', '2.0']))
+                changed_requires.append((u, v))
+
+            expected_provider = LatestProvider(g, recipes)
+            expected_provider.latest = dict(provider.latest)
+            provider.update([u for u, _ in changed_requires])
+            with self.subTest(seed=seed, packages=changed_packages, requires=changed_requires):
+                try:
+                    expected = bfs_builder('root', expected_provider)
+                except Exception:
+                    with self.assertRaises(Exception):
+                        bfs_update(graph, provider, changed_packages, changed_requires)
+                else:
+                    self._check_equal(bfs_update(graph, provider, changed_packages, changed_requires), expected)
@@ -0,0 +1,51 @@
+import pickle
+import unittest
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder, instrument, Statistics, BFSBuilderEx1
+from conans.graph.builders.instrumentation import ObservedProvider
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class InstrumentationTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # 'libB' also requires 'libA', which is resolved again (pruning 'zlib')
+        edges = [('root', 'libA', {'version': '1.0'}), ('root', 'libB', {'version': '1.0'}),
+                 ('libA', 'zlib', {'version': '1.0'}), ('libB', 'libA', {'version': '1.0'}),
+                 ('libA', 'cmake', {'version': '1.0', 'context': 'other'})]
+        self.g = input_graph(edges)
+
+    def test_statistics(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        stats = Statistics()
+        bfs_builder('root', provider, observers=[stats])
+
+        self.assertEqual(stats.counts['provider'], provider.calls)
+        self.assertEqual(stats.counts['examine_vertex'], stats.counts['finish_vertex'])
+        self.assertEqual(stats.counts['subgraph'], 2)  # 'libA' is examined twice
+        self.assertEqual(stats.counts['prune'], 1)
+        self.assertEqual(stats.pruned_nodes, 1)
+        self.assertEqual(stats.resolutions['libA'], 2)
+        self.assertIn(" - libA: 2", stats.summary(top=1))
+
+    def test_no_observers(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        builder = BFSBuilderEx1(Graph(), provider)
+        with instrument(builder, []):
+            self.assertEqual(vars(builder).keys() & {'examine_vertex', '_get_conanfile'}, set())
+            self.assertIs(builder.provider, provider)
+
+        stats = Statistics()
+        with instrument(builder, [stats]):
+            self.assertIn('examine_vertex', vars(builder))
+            self.assertIsNot(builder.provider, provider)
+        self.assertNotIn('examine_vertex', vars(builder))  # Restored
+        self.assertIs(builder.provider, provider)
+
+    def test_pickle_provider(self):
+        # Other attributes are taken from the wrapped provider, but not while unpickling
+        provider = ObservedProvider(CountingProvider(self.g, available_recipes(self.g)), [])
+        other = pickle.loads(pickle.dumps(provider))
+        self.assertEqual(other.get_conanfile('root', []).name, 'root')
+        self.assertEqual(other.calls, 1)
@@ -0,0 +1,71 @@
+import unittest
+
+from conans.graph.builders import bfs_builder
+from conans.graph.providers import CachingProvider
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class CachingProviderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # 'lib3' is privately required twice with the same constraints
+        self.g = input_graph([('root', 'lib1', {'version': '1.0'}),
+                              ('root', 'lib2', {'version': '1.0'}),
+                              ('lib1', 'lib3', {'version': '1.0', 'visibility': 'private'}),
+                              ('lib2', 'lib3', {'version': '1.0', 'visibility': 'private'}),
+                              ('lib3', 'lib4', {'version': '2.0'})])
+
+    def test_cache(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        caching_provider = CachingProvider(provider)
+        graph = bfs_builder('root', caching_provider)
+        calls = provider.calls
+        self.assertEqual(caching_provider.misses, calls)
+
+        # Building it again, everything is taken from the cache
+        other_graph = bfs_builder('root', caching_provider)
+        self.assertEqual(caching_provider.hits, calls)
+        self.assertEqual(provider.calls, calls)
+        self.assertIs(graph.nodes['lib1']['conanfile'], other_graph.nodes['lib1']['conanfile'])
+
+    def test_eviction(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        caching_provider = CachingProvider(provider, maxsize=1)
+        bfs_builder('root', caching_provider)
+        bfs_builder('root', caching_provider)
+        self.assertEqual(caching_provider.hits, 0)
+        self.assertEqual(len(caching_provider._cache), 1)
+
+    def test_not_pure(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        provider.pure = False
+        caching_provider = CachingProvider(provider)
+        bfs_builder('root', caching_provider)
+        self.assertEqual(caching_provider.hits + caching_provider.misses, 0)
+        self.assertEqual(len(caching_provider._cache), 0)
+
+
+class ProviderExampleTestCase(unittest.TestCase):
+
+    def test_precompiled_requires(self):
+        g = input_graph([('root', 'lib1', {'version': '1.0', 'options': 'shared=True'})])
+        provider = CountingProvider(g, available_recipes(g))
+        conanfile = provider.get_conanfile('root', [])
+        self.assertIs(conanfile.get_requires(), provider.get_conanfile('root', []).get_requires())
+        require, = conanfile.get_requires()
+        self.assertEqual(require.options, {'shared': 'True'})
+
+        g.edges['root', 'lib1']['version'] = '2.0'
+        self.assertEqual(provider.get_conanfile('root', []).get_requires()[0].version_expr, '1.0')
+        provider.update(['root'])
+        self.assertEqual(provider.get_conanfile('root', []).get_requires()[0].version_expr, '2.0')
+        self.assertIs(conanfile.get_requires()[0], require)  # Not modified
+
+    def test_version_ranges(self):
+        g = input_graph([('root', 'lib1', {'version': '[>=1.0 <3.0]'}),
+                         ('root', 'lib2', {'version': '~1.2'})])
+        recipes = available_recipes(g)
+        recipes['lib2'] = ['1.1', '1.2', '1.2.1', '1.3']
+        graph = bfs_builder('root', CountingProvider(g, recipes))
+        self.assertEqual(graph.nodes['lib1']['conanfile'].version, '2.0')
+        self.assertEqual(graph.nodes['lib2']['conanfile'].version, '1.2.1')
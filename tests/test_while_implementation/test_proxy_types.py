@@ -0,0 +1,60 @@
+import pickle
+import unittest
+
+from conans.graph.proxy_types import Require, ConanFile, Options, EdgeType, Context
+from examples.utils import ConanFileExample
+from tests.utils import input_graph, run_in_subprocess
+
+
+class OptionsTestCase(unittest.TestCase):
+
+    def test_interned(self):
+        self.assertIs(Options({'shared': 'True'}), Options({'shared': 'True'}))
+        self.assertIs(Options(), Options({}))
+        self.assertEqual(Options({'a': '1', 'b': '2'}), Options({'b': '2', 'a': '1'}))
+        self.assertEqual(hash(Options({'a': '1', 'b': '2'})), hash(Options({'b': '2', 'a': '1'})))
+        self.assertEqual(Options({'a': '1'}), {'a': '1'})
+        self.assertEqual(str(Options({'a': '1'})), str({'a': '1'}))
+        with self.assertRaises(TypeError):
+            Options({'a': '1'})['a'] = '2'
+
+
+class RequireTestCase(unittest.TestCase):
+
+    def test_interned(self):
+        require = Require.interned('zlib', '1.0', EdgeType.topological, context=Context.host, options={'a': '1'})
+        other = Require.interned('zlib', '1.0', EdgeType.topological, context=Context.host, options={'a': '1'})
+        self.assertIs(require, other)
+        self.assertIs(pickle.loads(pickle.dumps(require)).options, require.options)
+
+        different = Require('zlib', '1.0', EdgeType.topological, context=Context.host, options={'a': '2'})
+        self.assertEqual(len({require, other, different}), 2)
+
+
+class ConanFileTestCase(unittest.TestCase):
+
+    def test_hash(self):
+        conanfile = ConanFile('zlib', '1.0', {'shared': 'True'})
+        self.assertEqual(conanfile, ConanFile('zlib', '1.0', {'shared': 'True'}))
+        self.assertNotEqual(conanfile, ConanFile('zlib', '1.0', {'shared': 'False'}))
+        self.assertEqual(len({conanfile, ConanFile('zlib', '1.0', {'shared': 'True'}),
+                              ConanFile('zlib', '1.0', {'shared': 'False'})}), 2)
+        self.assertFalse(hasattr(conanfile, '__dict__'))
+
+    def test_pickle_other_process(self):
+        # The hash depends on the interpreter, it is not reused from the pickled object
+        data = run_in_subprocess("import pickle, sys\n"
+                                 "from conans.graph.proxy_types import ConanFile\n"
+                                 "from examples.utils import ConanFileExample\n"
+                                 "from tests.utils import input_graph\n"
+                                 "g = input_graph([('root', 'zlib', {'version': '1.0'})])\n"
+                                 "conanfiles = [ConanFile('zlib', '1.0', {'shared': 'True'}),\n"
+                                 "              ConanFileExample('root', None, g, {'a': '1'})]\n"
+                                 "sys.stdout.buffer.write(pickle.dumps(conanfiles))")
+        conanfile, example = pickle.loads(data)
+        self.assertEqual(conanfile, ConanFile('zlib', '1.0', {'shared': 'True'}))
+        self.assertEqual(hash(conanfile), hash(ConanFile('zlib', '1.0', {'shared': 'True'})))
+        self.assertIs(type(example), ConanFileExample)
+        g = input_graph([('root', 'zlib', {'version': '1.0'})])
+        self.assertEqual(example, ConanFileExample('root', None, g, {'a': '1'}))
+        self.assertEqual(example.get_requires()[0].name, 'zlib')
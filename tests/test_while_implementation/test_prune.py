@@ -0,0 +1,88 @@
+import unittest
+
+from conans.graph.builders import bfs_builder, BFSBuilderEx1
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class MinimalPruneBuilder(BFSBuilderEx1):
+    minimal_prune = True
+
+
+class PruneTestCase(unittest.TestCase):
+
+    def test_diamond_lattice(self):
+        # Every level requires both nodes in the next one: exponential number of paths
+        edges = [('root', 'a0', {'version': '1.0'}), ('root', 'b0', {'version': '1.0'})]
+        for i in range(40):
+            for ori in (f'a{i}', f'b{i}'):
+                edges += [(ori, f'a{i + 1}', {'version': '1.0'}), (ori, f'b{i + 1}', {'version': '1.0'})]
+        g = input_graph(edges)
+        for builder_class in (BFSBuilderEx1, MinimalPruneBuilder):
+            graph = bfs_builder('root', CountingProvider(g, available_recipes(g)), builder_class=builder_class)
+            self.assertEqual(len(graph.nodes), 83)
+
+    def test_deep_chain(self):
+        # The last node of a chain requires the first one of another chain, pruning a long branch
+        edges = [('root', 'a0', {'version': '1.0'}), ('root', 'b0', {'version': '1.0'})]
+        edges += [(f'a{i}', f'a{i + 1}', {'version': '1.0'}) for i in range(1500)]
+        edges += [(f'b{i}', f'b{i + 1}', {'version': '1.0'}) for i in range(1500)]
+        edges += [('a1500', 'b0', {'version': '1.0'})]
+        g = input_graph(edges)
+        graph = bfs_builder('root', CountingProvider(g, available_recipes(g)))
+        self.assertEqual(len(graph.nodes), 3003)
+
+    def test_cycle(self):
+        g = input_graph([('root', 'lib1', {'version': '1.0'}),
+                         ('lib1', 'lib2', {'version': '1.0'}),
+                         ('lib2', 'lib1', {'version': '1.0'})])
+        for builder_class in (BFSBuilderEx1, MinimalPruneBuilder):
+            with self.assertRaisesRegex(Exception, "There is cycle involving 'lib1' and 'lib2': lib2 -> lib1 -> lib2"):
+                bfs_builder('root', CountingProvider(g, available_recipes(g)), builder_class=builder_class)
+
+    def test_keep_requirements_outside_branch(self):
+        g = input_graph([('root', 'lib1', {'version': '1.0'}),
+                         ('root', 'lib3', {'version': '1.0'}),
+                         ('root', 'lib4', {'version': '2.0', 'edge_type': 'override'}),
+                         ('lib1', 'lib2', {'version': '1.0'}),
+                         ('lib2', 'lib3', {'version': '1.0'}),
+                         ('lib3', 'lib4', {'version': '1.0'})])
+        for builder_class in (BFSBuilderEx1, MinimalPruneBuilder):
+            graph = bfs_builder('root', CountingProvider(g, available_recipes(g)), builder_class=builder_class)
+            self.assertTrue(graph.has_edge('root', 'lib4'))
+            self.assertEqual(graph.nodes['lib4']['conanfile'].version, '2.0')
+
+    def test_minimal_prune(self):
+        # Requirements to 'common' from 'lib2' doesn't modify anything
+        edges = [('root', 'lib1', {'version': '1.0'}),
+                 ('root', 'lib2', {'version': '1.0'}),
+                 ('lib1', 'common', {'version': '1.0'}),
+                 ('lib2', 'lib3', {'version': '1.0'}),
+                 ('lib3', 'lib4', {'version': '1.0'}),
+                 ('lib4', 'common', {'version': '1.0'})]
+        edges += [('common', f'dep{i}', {'version': '1.0'}) for i in range(10)]
+        g = input_graph(edges)
+        provider = CountingProvider(g, available_recipes(g))
+        graph = bfs_builder('root', provider)
+        minimal_provider = CountingProvider(g, available_recipes(g))
+        minimal_graph = bfs_builder('root', minimal_provider, builder_class=MinimalPruneBuilder)
+        self.assertSetEqual(set(graph.edges), set(minimal_graph.edges))
+        self.assertLess(minimal_provider.calls, provider.calls)
+
+    def test_minimal_prune_requeued_target(self):
+        # The conanfile of a target pruned (and queued) is resolved again when it is examined,
+        #  'l2' -> 'l8' is discovered while 'l8' is in the queue and 'l6' takes precedence
+        g = input_graph([('root', 'l1', {'version': '2.0'}), ('l1', 'l2', {'version': '2.0'}),
+                         ('l2', 'l6', {'version': '2.0'}), ('root', 'l8', {'version': '2.0'}),
+                         ('l2', 'l8', {'version': '1.0'}), ('l6', 'l8', {'version': '2.0'})])
+        for builder_class in (BFSBuilderEx1, MinimalPruneBuilder):
+            graph = bfs_builder('root', CountingProvider(g, available_recipes(g)), builder_class=builder_class)
+            self.assertEqual(graph.nodes['l8']['conanfile'].version, '2.0')
+
+    def test_minimal_prune_requeued_ambiguity(self):
+        # Requirers 'l4' and 'l5' of 'l6' are unordered
+        g = input_graph([('root', 'l1', {'version': '2.0'}), ('l1', 'l4', {'version': '1.0'}),
+                         ('l1', 'l5', {'version': '2.0'}), ('root', 'l6', {'version': '2.0'}),
+                         ('l4', 'l6', {'version': '1.0'}), ('l5', 'l6', {'version': '2.0'})])
+        for builder_class in (BFSBuilderEx1, MinimalPruneBuilder):
+            with self.assertRaisesRegex(AssertionError, "Multiple conanfiles --> ambiguity!"):
+                bfs_builder('root', CountingProvider(g, available_recipes(g)), builder_class=builder_class)
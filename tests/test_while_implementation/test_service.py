@@ -0,0 +1,104 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+from typing import Dict
+
+import networkx as nx
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder
+from conans.graph.cache import loads
+from examples.client import request
+from examples.service import ResolverService, ResolverServer
+from examples.utils import ProviderExample
+
+INPUTS = os.path.join(os.path.dirname(__file__), '..', '..', 'examples', 'inputs')
+
+
+class ResolverServiceTestCase(unittest.TestCase):
+
+    def setUp(self):
+        with open(os.path.join(INPUTS, 'basic_example.xml')) as f:
+            self.graphml = f.read()
+        with open(os.path.join(INPUTS, 'server.json')) as f:
+            self.available_recipes = json.load(f)
+        self.service = ResolverService(self.available_recipes)
+
+    def _expected(self, input_graph: nx.DiGraph) -> Dict:
+        graph = bfs_builder('root', ProviderExample(input_graph, self.available_recipes))
+        return nx.to_dict_of_dicts(Graph.printable_graph(graph))
+
+    def _check(self, payload: bytes, input_graph: nx.DiGraph):
+        compact = loads(payload)
+        self.assertDictEqual(nx.to_dict_of_dicts(Graph.printable_graph(compact.to_networkx())),
+                             self._expected(input_graph))
+
+    def test_resolve(self):
+        response, payload = self.service.handle({'command': 'resolve', 'graphml': self.graphml})
+        self.assertEqual(response['status'], 'ok')
+        self.assertFalse(response['cached'])
+        self._check(payload, nx.parse_graphml(self.graphml))
+
+        other, other_payload = self.service.handle({'command': 'resolve', 'graphml': self.graphml})
+        self.assertTrue(other['cached'])
+        self.assertEqual(other['session'], response['session'])
+        self.assertEqual(other_payload, payload)
+
+        stats = self.service.stats()
+        self.assertEqual(stats['requests'], {'resolve': 2})
+        self.assertEqual(stats['graphs']['hit_rate'], 0.5)
+        self.assertEqual(stats['latency']['resolve']['count'], 2)
+
+    def test_update(self):
+        response, _ = self.service.handle({'command': 'resolve', 'graphml': self.graphml})
+        changes = [['lib2', 'lib1', {'version': '2.0'}], ['root', 'lib4', None]]
+        updated, payload = self.service.handle({'command': 'update', 'session': response['session'],
+                                                'changes': changes})
+        self.assertEqual(updated['status'], 'ok')
+        self.assertNotEqual(updated['session'], response['session'])
+
+        input_graph = nx.parse_graphml(self.graphml)
+        input_graph.edges['lib2', 'lib1']['version'] = '2.0'
+        input_graph.remove_edge('root', 'lib4')
+        self._check(payload, input_graph)
+
+        # The original input is not modified by the update
+        original, payload = self.service.handle({'command': 'resolve', 'graphml': self.graphml})
+        self.assertFalse(original['cached'])
+        self._check(payload, nx.parse_graphml(self.graphml))
+
+    def test_errors(self):
+        response, payload = self.service.handle({'command': 'update', 'session': 'missing', 'changes': []})
+        self.assertEqual(response['status'], 'error')
+        self.assertIn("Session 'missing' not found", response['message'])
+        response, _ = self.service.handle({'command': 'other'})
+        self.assertEqual(response['status'], 'error')
+        self.assertEqual(self.service.stats()['errors'], {'update': 1, 'other': 1})
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), "Requires Unix domain sockets")
+class ResolverServerTestCase(unittest.TestCase):
+
+    def test_socket(self):
+        with open(os.path.join(INPUTS, 'basic_example.xml')) as f:
+            graphml = f.read()
+        with tempfile.TemporaryDirectory() as tmp:
+            socket_path = os.path.join(tmp, 'resolver.sock')
+            service = ResolverService.from_file(os.path.join(INPUTS, 'server.json'))
+            with ResolverServer(socket_path, service) as server:
+                thread = threading.Thread(target=server.serve_forever)
+                thread.start()
+                try:
+                    response, payload = request({'command': 'resolve', 'graphml': graphml}, socket_path)
+                    self.assertEqual(response['status'], 'ok')
+                    self.assertEqual(len(loads(payload)), response['nodes'])
+                    stats, _ = request({'command': 'stats'}, socket_path)
+                    self.assertEqual(stats['requests'], {'resolve': 1})
+                finally:
+                    response, _ = request({'command': 'shutdown'}, socket_path)
+                    thread.join()
+                self.assertEqual(response['status'], 'ok')
+            self.assertFalse(os.path.exists(socket_path))
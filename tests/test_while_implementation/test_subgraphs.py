@@ -0,0 +1,71 @@
+import multiprocessing
+import unittest
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from conans.graph import Graph
+from conans.graph.builders import bfs_builder, Statistics
+from tests.utils import input_graph, CountingProvider, available_recipes
+
+
+class SharedSubgraphsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        edges = [('root', f'lib{i}', {'version': '1.0'}) for i in range(5)]
+        edges += [(f'lib{i}', 'cmake', {'version': '1.0', 'context': 'other'}) for i in range(5)]
+        edges += [('lib0', 'protobuf', {'version': '1.0', 'visibility': 'private'}),
+                  ('lib1', 'protobuf', {'version': '2.0', 'visibility': 'private'}),
+                  ('cmake', 'zlib', {'version': '1.0'})]
+        self.g = input_graph(edges)
+
+    def test_shared(self):
+        provider = CountingProvider(self.g, available_recipes(self.g))
+        graph = bfs_builder('root', provider)
+        self.assertEqual(provider.calls, 6 + 2 + 2)  # Host graph, cmake subgraph, protobuf subgraphs
+
+        cmake_subgraphs = {id(sg) for i in range(5) for sg, require in graph._subgraphs[f'lib{i}']
+                           if require.name == 'cmake'}
+        self.assertEqual(len(cmake_subgraphs), 1)
+        protobuf = [sg for i in range(2) for sg, require in graph._subgraphs[f'lib{i}'] if require.name == 'protobuf']
+        self.assertIsNot(protobuf[0], protobuf[1])
+
+        # Presented for each consumer
+        printable = Graph.printable_graph(graph)
+        for i in range(5):
+            self.assertTrue(printable.has_edge(f'lib{i}::cmake', f'lib{i}::zlib'))
+
+    def test_executor(self):
+        serial = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)))
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            graph = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)), executor=executor)
+
+        printable_serial = Graph.printable_graph(serial)
+        printable = Graph.printable_graph(graph)
+        self.assertListEqual(list(printable_serial.nodes(data=True)), list(printable.nodes(data=True)))
+        self.assertListEqual(list(printable_serial.edges(data=True)), list(printable.edges(data=True)))
+
+    def test_process_pool(self):
+        # Subgraphs built in other interpreters (spawn: different hash seed)
+        serial = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)))
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn')) as executor:
+            graph = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)), executor=executor)
+
+        for vertex, subgraphs in serial.get_subgraphs().items():
+            other = graph.get_subgraphs()[vertex]
+            self.assertEqual(len(subgraphs), len(other))
+            for (sg, require), (other_sg, other_require) in zip(subgraphs, other):
+                self.assertEqual(require, other_require)
+                self.assertDictEqual(dict(sg.nodes(data='conanfile')), dict(other_sg.nodes(data='conanfile')))
+        self.assertListEqual(list(Graph.printable_graph(serial).edges(data=True)),
+                             list(Graph.printable_graph(graph).edges(data=True)))
+
+    def test_process_pool_observers(self):
+        # Events in the worker processes are not reported, the rest of them are
+        serial = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)))
+        stats = Statistics()
+        with ProcessPoolExecutor(max_workers=2, mp_context=multiprocessing.get_context('spawn')) as executor:
+            graph = bfs_builder('root', CountingProvider(self.g, available_recipes(self.g)), executor=executor,
+                                observers=[stats])
+        self.assertListEqual(list(Graph.printable_graph(serial).edges(data=True)),
+                             list(Graph.printable_graph(graph).edges(data=True)))
+        self.assertEqual(stats.counts['provider'], 6)  # Only the host graph
+        self.assertEqual(stats.counts['subgraph'], 7)
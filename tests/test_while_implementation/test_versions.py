@@ -0,0 +1,58 @@
+import unittest
+
+from conans.graph.versions import Version, VersionRange, VersionIndex
+
+
+class VersionTestCase(unittest.TestCase):
+
+    def test_order(self):
+        versions = ['1.10', '1.2-rc1', '0.9', '1.2', '1.2.0', '1.9', '1.2-beta']
+        self.assertListEqual([it.value for it in sorted(Version.parse(it) for it in versions)],
+                             ['0.9', '1.2-beta', '1.2-rc1', '1.2', '1.2.0', '1.9', '1.10'])
+        self.assertEqual(Version.parse('1.2'), Version('1.2'))
+
+    def test_range(self):
+        r = VersionRange.parse('[>=1.0 <2.0 || =3.0]')
+        self.assertIn(Version('1.0'), r)
+        self.assertIn(Version('1.10'), r)
+        self.assertIn(Version('3.0'), r)
+        self.assertNotIn(Version('2.0'), r)
+        self.assertNotIn(Version('2.0-beta'), r)
+        self.assertNotIn(Version('0.9'), r)
+        self.assertIs(VersionRange.parse('[>=1.0 <2.0 || =3.0]'), r)
+
+    def test_intersection(self):
+        r = VersionRange.parse('>=1.0 <3.0').intersection(VersionRange.parse('[>2.0 || <1.1]'))
+        self.assertIn(Version('1.0'), r)
+        self.assertIn(Version('2.5'), r)
+        self.assertNotIn(Version('2.0'), r)
+        self.assertNotIn(Version('3.0'), r)
+        self.assertFalse(VersionRange.parse('<1.0').intersection(VersionRange.parse('>1.0')).intervals)
+
+
+class VersionIndexTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.index = VersionIndex(['1.0', '1.2', '1.2.5', '1.3-rc1', '1.3', '1.10', '2.0-rc', '2.0', '0.9'])
+
+    def test_best_match(self):
+        self.assertEqual(self.index.best_match('1.2'), '1.2')
+        self.assertEqual(self.index.best_match('[>=1.0 <2.0]'), '1.10')
+        self.assertEqual(self.index.best_match('~1.2'), '1.2.5')
+        self.assertEqual(self.index.best_match('^1.2'), '1.10')
+        self.assertEqual(self.index.best_match('^0.9'), '0.9')
+        self.assertEqual(self.index.best_match('[<1.3]'), '1.2.5')
+        self.assertEqual(self.index.best_match('[>=1.0 <1.2 || >=1.3 <1.4]'), '1.3')
+        self.assertEqual(self.index.best_match('*'), '2.0')
+        self.assertIsNone(self.index.best_match('>2.0'))
+        self.assertIsNone(self.index.best_match('1.1'))
+
+    def test_prereleases(self):
+        self.assertIsNone(self.index.best_match('[>1.2.5 <1.3]'))
+        self.assertEqual(self.index.best_match('[<=1.3-rc1]'), '1.3-rc1')
+        self.assertEqual(self.index.best_match('2.0-rc'), '2.0-rc')
+
+    def test_several_ranges(self):
+        self.assertEqual(self.index.best_match('>=1.0', '<1.3', '~1.2'), '1.2.5')
+        self.assertEqual(self.index.best_match('[<1.2 || >1.3]', '<2.0'), '1.10')
+        self.assertIsNone(self.index.best_match('<1.2', '>1.2'))
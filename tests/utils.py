@@ -0,0 +1,37 @@
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+import networkx as nx
+
+from examples.utils import CountingProvider  # noqa: F401 (used by the tests)
+
+EDGE_DEFAULT = {'edge_type': 'topological', 'require_type': 'library', 'visibility': 'public',
+                'context': 'host'}
+
+
+def input_graph(edges: List[Tuple[str, str, Dict[str, str]]]) -> nx.DiGraph:
+    """ Builds an input graph like the ones read from the GraphML files in the examples """
+    g = nx.DiGraph()
+    g.graph['node_default'] = {'library_type': 'static'}
+    g.graph['edge_default'] = EDGE_DEFAULT.copy()
+    for u, v, data in edges:
+        g.add_edge(u, v, **data)
+    return g
+
+
+def available_recipes(g: nx.DiGraph, root: str = 'root', versions=("1.0", "2.0", "3.0", "4.0")):
+    """ Same layout as 'examples/inputs/server.json': the root is not versioned """
+    recipes = {node: list(versions) for node in g.nodes}
+    recipes[root] = [None]
+    return recipes
+
+
+def run_in_subprocess(code: str, hash_seed: str = '1234') -> bytes:
+    """ Runs the code in a new interpreter (different hash seed) and returns its stdout, to check
+        the objects that are pickled and loaded in a different process
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONHASHSEED=hash_seed, PYTHONPATH=root)
+    return subprocess.check_output([sys.executable, '-c', code], env=env, cwd=root)